@@ -1,21 +1,54 @@
 import gradio as gr
-import requests
+import httpx
 import json
+import websockets
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
 
 API_BASE_URL = "http://localhost:8000/api/v1"
+ACTION_ITEM_COLUMNS = ['id', 'title', 'assignee', 'due_date', 'priority', 'status', 'tags']
+WS_BASE_URL = "ws://localhost:8000/ws"
 
+URLS = {
+    "pdf_extract": f"{API_BASE_URL}/terms/extract-from-pdf",
+    "search": f"{API_BASE_URL}/terms/search",
+    "transcribe": f"{API_BASE_URL}/transcription/transcribe",
+    "status": f"{API_BASE_URL}/transcription/status/",
+    "status_ws": f"{WS_BASE_URL}/transcription/",
+    "generate_minutes": f"{API_BASE_URL}/meetings/generate",
+    "action_items": f"{API_BASE_URL}/action-items/",
+    "bulk_status": f"{API_BASE_URL}/action-items/bulk-status",
+    "tag_statistics": f"{API_BASE_URL}/tags/statistics",
+}
 
-def upload_pdf_for_terms(file):
+CLIENT = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        retries=2
+    ),
+    timeout=httpx.Timeout(30.0, read=None),
+    follow_redirects=True
+)
+
+
+@asynccontextmanager
+async def lifespan(_):
+    # Runs on the server's loop, where the request handlers used the client.
+    yield
+    await CLIENT.aclose()
+
+
+async def upload_pdf_for_terms(file):
     if file is None:
         return "Please upload a PDF file"
         
     try:
         with open(file.name, 'rb') as f:
             files = {'file': (Path(file.name).name, f, 'application/pdf')}
-            response = requests.post(f"{API_BASE_URL}/terms/extract-from-pdf", files=files)
+            response = await CLIENT.post(URLS["pdf_extract"], files=files)
             
         if response.status_code == 200:
             return f"✅ PDF processing started: {response.json()['filename']}"
@@ -25,9 +58,9 @@ def upload_pdf_for_terms(file):
         return f"❌ Error: {str(e)}"
 
 
-def search_terms(query):
+async def search_terms(query):
     try:
-        response = requests.get(f"{API_BASE_URL}/terms/search", params={"query": query})
+        response = await CLIENT.get(URLS["search"], params={"query": query})
         if response.status_code == 200:
             results = response.json()["results"]
             if results:
@@ -42,15 +75,18 @@ def search_terms(query):
         return pd.DataFrame({"Error": [str(e)]})
 
 
-def transcribe_audio(file, apply_correction):
+async def transcribe_audio(file, apply_correction):
     if file is None:
         return "Please upload an audio file", ""
         
     try:
         with open(file.name, 'rb') as f:
-            files = {'file': (Path(file.name).name, f)}
-            data = {'apply_correction': apply_correction}
-            response = requests.post(f"{API_BASE_URL}/transcription/transcribe", files=files, data=data)
+            files = {'file': (Path(file.name).name, f, 'application/octet-stream')}
+            response = await CLIENT.post(
+                URLS["transcribe"],
+                files=files,
+                params={'apply_correction': apply_correction}
+            )
             
         if response.status_code == 200:
             task_id = response.json()["task_id"]
@@ -61,22 +97,35 @@ def transcribe_audio(file, apply_correction):
         return f"❌ Error: {str(e)}", ""
 
 
-def check_transcription_status(task_id):
-    if not task_id:
-        return "Please provide a task ID"
-        
+async def fetch_transcription_status(task_id):
     try:
-        response = requests.get(f"{API_BASE_URL}/transcription/status/{task_id}")
+        response = await CLIENT.get(URLS["status"] + task_id)
         if response.status_code == 200:
-            status = response.json()
-            return json.dumps(status, indent=2, ensure_ascii=False)
+            return response.json()
         else:
-            return f"Error: {response.text}"
+            return {"Error": response.text}
     except Exception as e:
-        return f"Error: {str(e)}"
+        return {"Error": str(e)}
 
 
-def generate_meeting_minutes(transcription_id, meeting_title, meeting_date, participants):
+async def check_transcription_status(task_id):
+    if not task_id:
+        yield {"Message": "Please provide a task ID"}
+        return
+        
+    try:
+        async with websockets.connect(URLS["status_ws"] + task_id) as ws:
+            async for message in ws:
+                status = json.loads(message)
+                if "detail" in status:
+                    yield {"Error": status["detail"]}
+                else:
+                    yield status
+    except Exception:
+        yield await fetch_transcription_status(task_id)
+
+
+async def generate_meeting_minutes(transcription_id, meeting_title, meeting_date, participants):
     if not all([transcription_id, meeting_title, meeting_date, participants]):
         return "Please fill all fields"
         
@@ -89,7 +138,7 @@ def generate_meeting_minutes(transcription_id, meeting_title, meeting_date, part
             "participants": participants_list
         }
         
-        response = requests.post(f"{API_BASE_URL}/meetings/generate", json=data)
+        response = await CLIENT.post(URLS["generate_minutes"], json=data)
         
         if response.status_code == 200:
             return f"✅ Meeting minutes generated. ID: {response.json()['meeting_minutes_id']}"
@@ -99,22 +148,24 @@ def generate_meeting_minutes(transcription_id, meeting_title, meeting_date, part
         return f"❌ Error: {str(e)}"
 
 
-def get_action_items(status_filter=None, priority_filter=None):
+async def get_action_items(status_filter=None, priority_filter=None):
     try:
-        params = {}
-        if status_filter and status_filter != "All":
-            params["status"] = status_filter.lower()
-        if priority_filter and priority_filter != "All":
-            params["priority"] = priority_filter.lower()
+        params = {
+            k: v.lower().replace(' ', '_')
+            for k, v in (("status", status_filter), ("priority", priority_filter))
+            if v and v != "All"
+        }
             
-        response = requests.get(f"{API_BASE_URL}/action-items", params=params)
+        response = await CLIENT.get(URLS["action_items"], params=params)
         
         if response.status_code == 200:
             items = response.json()["items"]
             if items:
-                df = pd.DataFrame(items)
-                df['tags'] = df['tags'].apply(lambda x: ', '.join(x))
-                return df[['id', 'title', 'assignee', 'due_date', 'priority', 'status', 'tags']]
+                rows = [
+                    [item[c] for c in ACTION_ITEM_COLUMNS[:-1]] + [', '.join(item['tags'])]
+                    for item in items
+                ]
+                return pd.DataFrame(rows, columns=ACTION_ITEM_COLUMNS)
             else:
                 return pd.DataFrame({"Message": ["No action items found"]})
         else:
@@ -123,16 +174,41 @@ def get_action_items(status_filter=None, priority_filter=None):
         return pd.DataFrame({"Error": [str(e)]})
 
 
-def get_tag_statistics():
+def add_pending_status_change(pending, item_ids, new_status):
+    try:
+        ids = [int(i.strip()) for i in item_ids.split(',') if i.strip()]
+    except ValueError:
+        return pending, "Please enter comma-separated item IDs"
+        
+    status = new_status.lower().replace(' ', '_')
+    pending = pending + [{"id": item_id, "status": status} for item_id in ids]
+    return pending, json.dumps(pending, indent=2, ensure_ascii=False)
+
+
+async def flush_status_changes(pending):
+    if not pending:
+        return pending, "No pending changes"
+        
     try:
-        response = requests.get(f"{API_BASE_URL}/tags/statistics")
+        response = await CLIENT.patch(URLS["bulk_status"], json=pending)
+        
         if response.status_code == 200:
-            stats = response.json()
-            return json.dumps(stats, indent=2, ensure_ascii=False)
+            return [], f"✅ Updated {response.json()['updated']} items"
         else:
-            return f"Error: {response.text}"
+            return pending, f"❌ Error: {response.text}"
     except Exception as e:
-        return f"Error: {str(e)}"
+        return pending, f"❌ Error: {str(e)}"
+
+
+async def get_tag_statistics():
+    try:
+        response = await CLIENT.get(URLS["tag_statistics"])
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"Error": response.text}
+    except Exception as e:
+        return {"Error": str(e)}
 
 
 with gr.Blocks(title="Action Items System") as app:
@@ -175,7 +251,7 @@ with gr.Blocks(title="Action Items System") as app:
             task_id_input = gr.Textbox(label="タスクID")
             check_status_btn = gr.Button("状況確認")
         
-        status_result = gr.Textbox(label="処理状況", lines=10)
+        status_result = gr.JSON(label="処理状況")
         
         transcribe_btn.click(
             transcribe_audio,
@@ -230,12 +306,39 @@ with gr.Blocks(title="Action Items System") as app:
             inputs=[status_filter, priority_filter],
             outputs=[action_items_table]
         )
+        
+        gr.Markdown("## ステータス一括更新")
+        
+        pending_changes = gr.State([])
+        
+        with gr.Row():
+            bulk_item_ids = gr.Textbox(label="アイテムID (カンマ区切り)", placeholder="1, 2, 3")
+            bulk_status = gr.Dropdown(
+                choices=["Pending", "In Progress", "Completed", "Cancelled"],
+                value="Completed",
+                label="新しいステータス"
+            )
+            add_change_btn = gr.Button("変更を追加")
+            flush_changes_btn = gr.Button("一括更新", variant="primary")
+        
+        pending_output = gr.Textbox(label="未反映の変更", lines=5)
+        
+        add_change_btn.click(
+            add_pending_status_change,
+            inputs=[pending_changes, bulk_item_ids, bulk_status],
+            outputs=[pending_changes, pending_output]
+        )
+        flush_changes_btn.click(
+            flush_status_changes,
+            inputs=[pending_changes],
+            outputs=[pending_changes, pending_output]
+        )
     
     with gr.Tab("タグ統計"):
         gr.Markdown("## タグ使用統計")
         
         get_stats_btn = gr.Button("統計情報取得", variant="primary")
-        stats_output = gr.Textbox(label="タグ統計", lines=15)
+        stats_output = gr.JSON(label="タグ統計")
         
         get_stats_btn.click(get_tag_statistics, outputs=[stats_output])
     
@@ -250,4 +353,4 @@ with gr.Blocks(title="Action Items System") as app:
     """)
 
 if __name__ == "__main__":
-    app.launch(share=True)
\ No newline at end of file
+    app.launch(share=True, app_kwargs={"lifespan": lifespan})
\ No newline at end of file
@@ -0,0 +1,45 @@
+from fastapi import Depends, Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.database import get_db, ActionItemDB, MeetingMinutesDB, TagDB, action_item_tags
+
+CACHE_CONTROL = "private, max-age=2"
+
+data_generation = 0
+
+
+def bump_data_generation():
+    global data_generation
+    data_generation += 1
+
+
+def make_etag(*parts) -> str:
+    # SQLite timestamps only have second resolution, so the in-process
+    # generation is included to catch changes made within the same second.
+    return 'W/"' + "-".join(str(p) for p in (*parts, data_generation)) + '"'
+
+
+def etag_for_action_items(db: Session = Depends(get_db)) -> str:
+    latest, count = db.query(func.max(ActionItemDB.updated_at), func.count(ActionItemDB.id)).one()
+    return make_etag(latest.timestamp() if latest else 0, count)
+
+
+def etag_for_meetings(db: Session = Depends(get_db)) -> str:
+    latest, count = db.query(func.max(MeetingMinutesDB.created_at), func.count(MeetingMinutesDB.id)).one()
+    return make_etag(latest.timestamp() if latest else 0, count)
+
+
+def etag_for_tags(db: Session = Depends(get_db)) -> str:
+    tag_count = db.query(func.count(TagDB.id)).scalar()
+    link_count = db.query(func.count()).select_from(action_item_tags).scalar()
+    return make_etag(tag_count, link_count)
+
+
+def check_etag(request: Request, response: Response, etag: str) -> bool:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return request.headers.get("If-None-Match") == etag
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
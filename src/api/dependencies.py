@@ -0,0 +1,26 @@
+from fastapi import Request
+from ..services.tagging import SmartTagger
+from ..services.vector_search import VectorSearchEngine
+from ..services.pdf_extractor import PDFTermExtractor
+from ..services.transcription import WhisperTranscriber
+from ..services.meeting_minutes import MeetingMinutesGenerator
+
+
+def get_tagger(request: Request) -> SmartTagger:
+    return request.app.state.tagger
+
+
+def get_vector_engine(request: Request) -> VectorSearchEngine:
+    return request.app.state.vector_engine
+
+
+def get_pdf_extractor(request: Request) -> PDFTermExtractor:
+    return request.app.state.pdf_extractor
+
+
+def get_transcriber(request: Request) -> WhisperTranscriber:
+    return request.app.state.transcriber
+
+
+def get_minutes_generator(request: Request) -> MeetingMinutesGenerator:
+    return request.app.state.minutes_generator
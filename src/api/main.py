@@ -1,9 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from ..core.config import settings
 from ..core.database import init_db
+from ..services.tagging import SmartTagger
+from ..services.vector_search import VectorSearchEngine
+from ..services.pdf_extractor import PDFTermExtractor
+from ..services.transcription import WhisperTranscriber
+from ..services.meeting_minutes import MeetingMinutesGenerator
+from .middleware import ContentLengthLimitMiddleware
 from .routers import terms, transcription, meetings, action_items, tags
 
 logging.basicConfig(level=settings.log_level)
@@ -14,15 +22,23 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     init_db()
+    app.state.tagger = SmartTagger()
+    app.state.vector_engine = VectorSearchEngine()
+    app.state.pdf_extractor = PDFTermExtractor()
+    app.state.transcriber = WhisperTranscriber(app.state.vector_engine)
+    app.state.minutes_generator = MeetingMinutesGenerator()
     yield
     logger.info("Shutting down...")
+    await app.state.minutes_generator.aclose()
+    await asyncio.to_thread(terms.shutdown_executors)
 
 
 app = FastAPI(
     title="Action Items API",
     description="Speech transcription and action item generation for construction industry",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -32,6 +48,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ContentLengthLimitMiddleware, max_body_size=settings.max_file_size)
 
 app.include_router(terms.router, prefix=f"{settings.api_prefix}/terms", tags=["terms"])
 app.include_router(transcription.router, prefix=f"{settings.api_prefix}/transcription", tags=["transcription"])
@@ -51,4 +68,32 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.websocket("/ws/transcription/{task_id}")
+async def transcription_status_ws(websocket: WebSocket, task_id: str):
+    await websocket.accept()
+    
+    if task_id not in transcription.status_store:
+        await websocket.send_json({"detail": "Task not found"})
+        await websocket.close()
+        return
+        
+    try:
+        while True:
+            status = transcription.status_store.get(task_id)
+            if status is None:
+                break
+                
+            event = transcription.status_store.event(task_id)
+            await websocket.send_text(status.model_dump_json())
+            
+            if status.status in ("completed", "failed"):
+                break
+                
+            await event.wait()
+    except WebSocketDisconnect:
+        return
+        
+    await websocket.close()
@@ -0,0 +1,21 @@
+from fastapi.responses import ORJSONResponse
+
+MULTIPART_OVERHEAD = 1 << 16
+
+
+class ContentLengthLimitMiddleware:
+    # Form bodies are parsed before any handler or dependency runs, so an
+    # oversized request has to be turned away here to avoid spooling it.
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            content_length = dict(scope["headers"]).get(b"content-length")
+            if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+                response = ORJSONResponse({"detail": "File too large"}, status_code=413)
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
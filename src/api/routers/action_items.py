@@ -1,25 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, update
 from typing import List, Optional
 from datetime import datetime
-import json
+from collections import defaultdict
 from ...core.database import get_db, ActionItemDB, TagDB
-from ...core.models import ActionItemStatus, ActionItemPriority
+from ...core.models import ActionItemStatus, ActionItemPriority, BulkStatusUpdate
 from ...services.tagging import SmartTagger
+from ..dependencies import get_tagger
+from ..caching import bump_data_generation, check_etag, not_modified_response, etag_for_action_items
 
 router = APIRouter()
 
 
 @router.get("/")
 async def list_action_items(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     assignee: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    etag: str = Depends(etag_for_action_items)
 ):
-    query = db.query(ActionItemDB)
+    if check_etag(request, response, etag):
+        return not_modified_response(etag)
+        
+    query = db.query(ActionItemDB).options(selectinload(ActionItemDB.tags))
     
     if status:
         query = query.filter(ActionItemDB.status == status)
@@ -28,11 +37,17 @@ async def list_action_items(
     if assignee:
         query = query.filter(ActionItemDB.assignee == assignee)
         
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+    rows = query.add_columns(
+        func.count().over().label("total")
+    ).offset(skip).limit(limit).all()
+    
+    if rows:
+        total = rows[0].total
+    else:
+        total = query.count() if skip else 0
     
     results = []
-    for item in items:
+    for item, _ in rows:
         tags = [tag.name for tag in item.tags]
         results.append({
             "id": item.id,
@@ -54,6 +69,64 @@ async def list_action_items(
     }
 
 
+@router.get("/by-tags")
+async def search_by_tags(
+    tags: str,
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger)
+):
+    tag_list = tags.split(",")
+    items = tagger.search_by_tags(tag_list, db)
+    
+    results = []
+    for item in items:
+        item_tags = [tag.name for tag in item.tags]
+        results.append({
+            "id": item.id,
+            "title": item.title,
+            "assignee": item.assignee,
+            "due_date": item.due_date,
+            "priority": item.priority,
+            "status": item.status,
+            "tags": item_tags
+        })
+        
+    return results
+
+
+@router.get("/overdue")
+async def get_overdue_items(
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    now = datetime.now()
+    items = db.query(ActionItemDB).options(
+        selectinload(ActionItemDB.tags)
+    ).filter(
+        ActionItemDB.due_date < now,
+        ActionItemDB.status.notin_(("completed", "cancelled"))
+    ).order_by(ActionItemDB.due_date.asc()).offset(skip).limit(limit).all()
+    
+    results = []
+    for item in items:
+        tags = [tag.name for tag in item.tags]
+        days_overdue = (now - item.due_date).days
+        
+        results.append({
+            "id": item.id,
+            "title": item.title,
+            "assignee": item.assignee,
+            "due_date": item.due_date,
+            "days_overdue": days_overdue,
+            "priority": item.priority,
+            "status": item.status,
+            "tags": tags
+        })
+        
+    return results
+
+
 @router.get("/{item_id}")
 async def get_action_item(
     item_id: int,
@@ -65,7 +138,6 @@ async def get_action_item(
         raise HTTPException(status_code=404, detail="Action item not found")
         
     tags = [tag.name for tag in item.tags]
-    source_segment = json.loads(item.source_segment) if item.source_segment else None
     
     return {
         "id": item.id,
@@ -76,7 +148,7 @@ async def get_action_item(
         "priority": item.priority,
         "status": item.status,
         "tags": tags,
-        "source_segment": source_segment,
+        "source_segment": item.source_segment,
         "confidence": item.confidence,
         "meeting_minutes_id": item.meeting_minutes_id,
         "created_at": item.created_at,
@@ -84,6 +156,28 @@ async def get_action_item(
     }
 
 
+@router.patch("/bulk-status")
+async def bulk_update_action_item_status(
+    updates: List[BulkStatusUpdate] = Body(...),
+    db: Session = Depends(get_db)
+):
+    ids_by_status = defaultdict(list)
+    for u in updates:
+        ids_by_status[u.status.value].append(u.id)
+        
+    updated = 0
+    for status, ids in ids_by_status.items():
+        result = db.execute(
+            update(ActionItemDB).where(ActionItemDB.id.in_(ids)).values(status=status)
+        )
+        updated += result.rowcount
+        
+    db.commit()
+    bump_data_generation()
+    
+    return {"message": "Statuses updated successfully", "updated": updated}
+
+
 @router.patch("/{item_id}/status")
 async def update_action_item_status(
     item_id: int,
@@ -97,6 +191,7 @@ async def update_action_item_status(
         
     item.status = status.value
     db.commit()
+    bump_data_generation()
     
     return {"message": "Status updated successfully"}
 
@@ -109,7 +204,8 @@ async def update_action_item(
     assignee: Optional[str] = Body(None),
     due_date: Optional[datetime] = Body(None),
     priority: Optional[ActionItemPriority] = Body(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger)
 ):
     item = db.query(ActionItemDB).filter(ActionItemDB.id == item_id).first()
     
@@ -129,8 +225,8 @@ async def update_action_item(
         
     db.commit()
     
-    tagger = SmartTagger()
     tagger.tag_action_item(item_id, db)
+    bump_data_generation()
     
     return {"message": "Action item updated successfully"}
 
@@ -139,9 +235,9 @@ async def update_action_item(
 async def get_related_items(
     item_id: int,
     limit: int = 5,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger)
 ):
-    tagger = SmartTagger()
     related = tagger.find_related_items(item_id, db, limit)
     
     results = []
@@ -157,58 +253,3 @@ async def get_related_items(
         })
         
     return results
-
-
-@router.get("/by-tags")
-async def search_by_tags(
-    tags: str,
-    db: Session = Depends(get_db)
-):
-    tag_list = tags.split(",")
-    tagger = SmartTagger()
-    items = tagger.search_by_tags(tag_list, db)
-    
-    results = []
-    for item in items:
-        item_tags = [tag.name for tag in item.tags]
-        results.append({
-            "id": item.id,
-            "title": item.title,
-            "assignee": item.assignee,
-            "due_date": item.due_date,
-            "priority": item.priority,
-            "status": item.status,
-            "tags": item_tags
-        })
-        
-    return results
-
-
-@router.get("/overdue")
-async def get_overdue_items(
-    db: Session = Depends(get_db)
-):
-    now = datetime.now()
-    items = db.query(ActionItemDB).filter(
-        ActionItemDB.due_date < now,
-        ActionItemDB.status != "completed",
-        ActionItemDB.status != "cancelled"
-    ).all()
-    
-    results = []
-    for item in items:
-        tags = [tag.name for tag in item.tags]
-        days_overdue = (now - item.due_date).days
-        
-        results.append({
-            "id": item.id,
-            "title": item.title,
-            "assignee": item.assignee,
-            "due_date": item.due_date,
-            "days_overdue": days_overdue,
-            "priority": item.priority,
-            "status": item.status,
-            "tags": tags
-        })
-        
-    return sorted(results, key=lambda x: x["days_overdue"], reverse=True)
\ No newline at end of file
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime
-import json
-from ...core.database import get_db, MeetingMinutesDB, TranscriptionDB
+from ...core.database import get_db, MeetingMinutesDB, TranscriptionDB, ActionItemDB
 from ...core.models import MeetingMinutes, ActionItem
 from ...services.meeting_minutes import MeetingMinutesGenerator
 from ...services.transcription import WhisperTranscriber
+from ...services.tagging import SmartTagger
+from ..dependencies import get_tagger, get_transcriber, get_minutes_generator
+from ..caching import bump_data_generation, check_etag, not_modified_response, etag_for_meetings
 
 router = APIRouter()
 
@@ -17,16 +20,16 @@ async def generate_meeting_minutes(
     meeting_title: str = Body(...),
     meeting_date: datetime = Body(...),
     participants: List[str] = Body(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger),
+    transcriber: WhisperTranscriber = Depends(get_transcriber),
+    generator: MeetingMinutesGenerator = Depends(get_minutes_generator)
 ):
-    transcriber = WhisperTranscriber()
     transcription = transcriber.get_transcription(transcription_id, db)
     
     if not transcription:
         raise HTTPException(status_code=404, detail="Transcription not found")
         
-    generator = MeetingMinutesGenerator()
-    
     minutes = await generator.generate_minutes(
         transcription,
         meeting_title,
@@ -36,12 +39,9 @@ async def generate_meeting_minutes(
     
     minutes_id = generator.save_minutes(minutes, db)
     
-    from ...services.tagging import SmartTagger
-    tagger = SmartTagger()
-    
     db_minutes = db.query(MeetingMinutesDB).filter(MeetingMinutesDB.id == minutes_id).first()
-    for action_item in db_minutes.action_items:
-        tagger.tag_action_item(action_item.id, db)
+    tagger.tag_action_items_bulk([item.id for item in db_minutes.action_items], db)
+    bump_data_generation()
         
     return {
         "meeting_minutes_id": minutes_id,
@@ -54,7 +54,9 @@ async def get_meeting_minutes(
     minutes_id: int,
     db: Session = Depends(get_db)
 ):
-    db_minutes = db.query(MeetingMinutesDB).filter(
+    db_minutes = db.query(MeetingMinutesDB).options(
+        selectinload(MeetingMinutesDB.action_items).selectinload(ActionItemDB.tags)
+    ).filter(
         MeetingMinutesDB.id == minutes_id
     ).first()
     
@@ -80,37 +82,54 @@ async def get_meeting_minutes(
         "id": db_minutes.id,
         "meeting_title": db_minutes.meeting_title,
         "meeting_date": db_minutes.meeting_date,
-        "participants": json.loads(db_minutes.participants),
+        "participants": db_minutes.participants,
         "summary": db_minutes.summary,
         "transcription_id": db_minutes.transcription_id,
         "action_items": action_items,
-        "key_decisions": json.loads(db_minutes.key_decisions),
-        "next_steps": json.loads(db_minutes.next_steps),
+        "key_decisions": db_minutes.key_decisions,
+        "next_steps": db_minutes.next_steps,
         "created_at": db_minutes.created_at
     }
 
 
 @router.get("/")
 async def list_meeting_minutes(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    etag: str = Depends(etag_for_meetings)
 ):
-    minutes = db.query(MeetingMinutesDB).offset(skip).limit(limit).all()
+    if check_etag(request, response, etag):
+        return not_modified_response(etag)
+        
+    minutes = db.query(
+        MeetingMinutesDB,
+        func.count(ActionItemDB.id).label("action_items_count"),
+        func.count().over().label("total")
+    ).outerjoin(MeetingMinutesDB.action_items).group_by(
+        MeetingMinutesDB.id
+    ).offset(skip).limit(limit).all()
+    
+    if minutes:
+        total = minutes[0].total
+    else:
+        total = db.query(MeetingMinutesDB).count() if skip else 0
     
     results = []
-    for m in minutes:
+    for m, action_items_count, _ in minutes:
         results.append({
             "id": m.id,
             "meeting_title": m.meeting_title,
             "meeting_date": m.meeting_date,
-            "participants": json.loads(m.participants),
-            "action_items_count": len(m.action_items),
+            "participants": m.participants,
+            "action_items_count": action_items_count,
             "created_at": m.created_at
         })
         
     return {
-        "total": db.query(MeetingMinutesDB).count(),
+        "total": total,
         "items": results
     }
 
@@ -121,19 +140,22 @@ async def get_meetings_by_date_range(
     end_date: datetime,
     db: Session = Depends(get_db)
 ):
-    minutes = db.query(MeetingMinutesDB).filter(
+    minutes = db.query(
+        MeetingMinutesDB,
+        func.count(ActionItemDB.id).label("action_items_count")
+    ).outerjoin(MeetingMinutesDB.action_items).filter(
         MeetingMinutesDB.meeting_date >= start_date,
         MeetingMinutesDB.meeting_date <= end_date
-    ).all()
+    ).group_by(MeetingMinutesDB.id).all()
     
     results = []
-    for m in minutes:
+    for m, action_items_count in minutes:
         results.append({
             "id": m.id,
             "meeting_title": m.meeting_title,
             "meeting_date": m.meeting_date,
-            "participants": json.loads(m.participants),
-            "action_items_count": len(m.action_items)
+            "participants": m.participants,
+            "action_items_count": action_items_count
         })
         
     return results
\ No newline at end of file
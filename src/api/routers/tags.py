@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session, selectinload
 from typing import List
+from cachetools import TTLCache
+import asyncio
 from ...core.database import get_db, TagDB, ActionItemDB
 from ...services.tagging import SmartTagger
+from ..dependencies import get_tagger
+from .. import caching
 
 router = APIRouter()
 
+tag_cache = TTLCache(maxsize=64, ttl=30)
+tag_cache_lock = asyncio.Lock()
+
 
 @router.get("/")
 async def list_tags(
+    request: Request,
+    response: Response,
     category: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    etag: str = Depends(caching.etag_for_tags)
 ):
-    query = db.query(TagDB)
+    if caching.check_etag(request, response, etag):
+        return caching.not_modified_response(etag)
+        
+    query = db.query(TagDB).options(selectinload(TagDB.action_items))
     
     if category:
         query = query.filter(TagDB.category == category)
@@ -34,33 +47,46 @@ async def list_tags(
 
 
 @router.get("/statistics")
-async def get_tag_statistics(db: Session = Depends(get_db)):
-    tagger = SmartTagger()
-    return tagger.get_tag_statistics(db)
+async def get_tag_statistics(
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger)
+):
+    key = ("statistics", caching.data_generation)
+    async with tag_cache_lock:
+        if key not in tag_cache:
+            tag_cache[key] = tagger.get_tag_statistics(db)
+        return tag_cache[key]
 
 
 @router.get("/suggest")
 async def suggest_tags(
     query: str,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger)
 ):
-    tagger = SmartTagger()
     suggestions = tagger.suggest_tags(query, db, limit)
     return {"suggestions": suggestions}
 
 
 @router.post("/retag-all")
-async def retag_all_items(db: Session = Depends(get_db)):
-    tagger = SmartTagger()
+async def retag_all_items(
+    db: Session = Depends(get_db),
+    tagger: SmartTagger = Depends(get_tagger)
+):
     results = tagger.tag_all_action_items(db)
+    caching.bump_data_generation()
     return results
 
 
 @router.get("/categories")
 async def get_tag_categories(db: Session = Depends(get_db)):
-    categories = db.query(TagDB.category).distinct().all()
-    return {"categories": [c[0] for c in categories]}
+    key = ("categories", caching.data_generation)
+    async with tag_cache_lock:
+        if key not in tag_cache:
+            categories = db.query(TagDB.category).distinct().all()
+            tag_cache[key] = {"categories": [c[0] for c in categories]}
+        return tag_cache[key]
 
 
 @router.get("/{tag_name}/items")
@@ -68,7 +94,9 @@ async def get_items_by_tag(
     tag_name: str,
     db: Session = Depends(get_db)
 ):
-    tag = db.query(TagDB).filter(TagDB.name == tag_name).first()
+    tag = db.query(TagDB).options(
+        selectinload(TagDB.action_items)
+    ).filter(TagDB.name == tag_name).first()
     
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
@@ -1,44 +1,127 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pathlib import Path
-import shutil
-from ...core.database import get_db
+from concurrent.futures import ThreadPoolExecutor
+import aiofiles
+import hashlib
+import orjson
+import logging
+import threading
+from ...core.config import settings
+from ...core.database import get_db, SessionLocal, PDFTermsCacheDB
 from ...core.models import Term, TermType
 from ...services.pdf_extractor import PDFTermExtractor
 from ...services.vector_search import VectorSearchEngine
+from ..dependencies import get_pdf_extractor, get_vector_engine
 
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+pdf_executor = ThreadPoolExecutor(max_workers=2)
+index_executor = ThreadPoolExecutor(max_workers=1)
+index_rebuild_lock = threading.Lock()
+index_rebuild_pending = False
+
+
+def shutdown_executors():
+    # Queued work is dropped; anything already running is allowed to finish.
+    for executor in (pdf_executor, index_executor):
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def schedule_index_rebuild(vector_engine: VectorSearchEngine):
+    global index_rebuild_pending
+    with index_rebuild_lock:
+        if index_rebuild_pending:
+            return
+        index_rebuild_pending = True
+    index_executor.submit(_rebuild_index, vector_engine)
+
+
+def _rebuild_index(vector_engine: VectorSearchEngine):
+    global index_rebuild_pending
+    # Clear the flag before reading the DB so terms saved during the rebuild
+    # schedule another one.
+    with index_rebuild_lock:
+        index_rebuild_pending = False
+        
+    db = SessionLocal()
+    try:
+        vector_engine.build_index_from_db(db)
+    except Exception as e:
+        logger.error(f"Error rebuilding index: {e}")
+    finally:
+        db.close()
+
+
+def _process_pdf(
+    extractor: PDFTermExtractor,
+    vector_engine: VectorSearchEngine,
+    temp_file: Path,
+    filename: str,
+    file_hash: str
+):
+    db = SessionLocal()
+    try:
+        terms = extractor.extract_terms_from_pdf(temp_file, filename)
+        
+        db.merge(PDFTermsCacheDB(
+            hash=file_hash,
+            terms=orjson.dumps([t.dict(exclude={"created_at"}) for t in terms]).decode()
+        ))
+        extractor.save_terms_to_db(terms, db)
+        
+        schedule_index_rebuild(vector_engine)
+    except Exception as e:
+        logger.error(f"Error processing PDF {filename}: {e}")
+    finally:
+        db.close()
+        if temp_file.exists():
+            temp_file.unlink()
+
 
 @router.post("/extract-from-pdf")
 async def extract_terms_from_pdf(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    extractor: PDFTermExtractor = Depends(get_pdf_extractor),
+    vector_engine: VectorSearchEngine = Depends(get_vector_engine)
 ):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-    temp_file = Path(f"/tmp/{file.filename}")
-    with temp_file.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    if file.size is not None and file.size > settings.max_file_size:
+        raise HTTPException(status_code=413, detail="File too large")
         
-    extractor = PDFTermExtractor()
-    
-    def process_pdf():
-        try:
-            terms = extractor.extract_terms_from_pdf(temp_file, file.filename)
-            extractor.save_terms_to_db(terms, db)
-            
-            vector_engine = VectorSearchEngine()
-            vector_engine.build_index_from_db(db)
-            
-            temp_file.unlink()
-        except Exception as e:
-            print(f"Error processing PDF: {e}")
+    temp_file = Path(f"/tmp/{file.filename}")
+    sha256 = hashlib.sha256()
+    async with aiofiles.open(temp_file, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            sha256.update(chunk)
+            await buffer.write(chunk)
             
-    background_tasks.add_task(process_pdf)
+    file_hash = sha256.hexdigest()
+    cached = db.query(PDFTermsCacheDB).filter(PDFTermsCacheDB.hash == file_hash).first()
+    
+    if cached:
+        temp_file.unlink()
+        
+        terms = [
+            Term(**{**t, "source_document": file.filename})
+            for t in orjson.loads(cached.terms)
+        ]
+        # Kept off pdf_executor so a cache hit never queues behind full extractions.
+        await run_in_threadpool(extractor.save_terms_to_db, terms, db)
+        schedule_index_rebuild(vector_engine)
+        
+        return {"message": "PDF terms loaded from cache", "filename": file.filename}
+        
+    pdf_executor.submit(_process_pdf, extractor, vector_engine, temp_file, file.filename, file_hash)
     
     return {"message": "PDF processing started", "filename": file.filename}
 
@@ -47,19 +130,18 @@ async def extract_terms_from_pdf(
 async def process_pdf_directory(
     directory_path: str,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    extractor: PDFTermExtractor = Depends(get_pdf_extractor),
+    vector_engine: VectorSearchEngine = Depends(get_vector_engine)
 ):
     directory = Path(directory_path)
     if not directory.exists() or not directory.is_dir():
         raise HTTPException(status_code=400, detail="Invalid directory path")
         
-    extractor = PDFTermExtractor()
-    
     def process_directory():
         results = extractor.process_pdf_directory(directory)
         
-        vector_engine = VectorSearchEngine()
-        vector_engine.build_index_from_db(db)
+        schedule_index_rebuild(vector_engine)
         
         return results
         
@@ -72,9 +154,9 @@ async def process_pdf_directory(
 async def search_terms(
     query: str,
     limit: int = 10,
-    threshold: float = 0.8
+    threshold: float = 0.8,
+    vector_engine: VectorSearchEngine = Depends(get_vector_engine)
 ):
-    vector_engine = VectorSearchEngine()
     results = vector_engine.search(query, k=limit, threshold=threshold)
     
     return {
@@ -93,9 +175,9 @@ async def search_terms(
 @router.get("/similar/{term}")
 async def find_similar_terms(
     term: str,
-    limit: int = 5
+    limit: int = 5,
+    vector_engine: VectorSearchEngine = Depends(get_vector_engine)
 ):
-    vector_engine = VectorSearchEngine()
     results = vector_engine.find_similar_terms(term, k=limit)
     
     return {
@@ -112,13 +194,8 @@ async def find_similar_terms(
 
 @router.post("/rebuild-index")
 async def rebuild_vector_index(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    vector_engine: VectorSearchEngine = Depends(get_vector_engine)
 ):
-    def rebuild():
-        vector_engine = VectorSearchEngine()
-        vector_engine.build_index_from_db(db)
-        
-    background_tasks.add_task(rebuild)
+    schedule_index_rebuild(vector_engine)
     
     return {"message": "Index rebuild started"}
\ No newline at end of file
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional
+from cachetools import TTLCache
 from pathlib import Path
+import asyncio
+import os
 import shutil
 import uuid
 from datetime import datetime
@@ -10,10 +14,64 @@ from ...core.database import get_db
 from ...core.models import ProcessingStatus
 from ...services.transcription import WhisperTranscriber
 from ...core.config import settings
+from ..dependencies import get_transcriber
 
 router = APIRouter()
 
-processing_status = {}
+SENDFILE_CHUNK_SIZE = 1 << 24
+
+AUDIO_SIGNATURES = {
+    '.mp3': lambda h: h.startswith(b"ID3") or (h[:1] == b"\xff" and h[1:2] >= b"\xe0"),
+    '.mp4': lambda h: h[4:8] == b"ftyp",
+    '.wav': lambda h: h.startswith(b"RIFF") and h[8:12] == b"WAVE",
+    '.m4a': lambda h: h[4:8] == b"ftyp",
+    '.flac': lambda h: h.startswith(b"fLaC"),
+    '.ogg': lambda h: h.startswith(b"OggS"),
+}
+
+
+class StatusStore:
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.entries
+        
+    def get(self, task_id: str) -> Optional[ProcessingStatus]:
+        entry = self.entries.get(task_id)
+        return entry[0] if entry else None
+        
+    def event(self, task_id: str) -> asyncio.Event:
+        return self.entries[task_id][1]
+        
+    def set(self, status: ProcessingStatus):
+        # Swap in a fresh event before waking subscribers so every waiter sees
+        # this transition once and then blocks on the next one.
+        entry = self.entries.get(status.task_id)
+        self.entries[status.task_id] = (status, asyncio.Event())
+        if entry is not None:
+            entry[1].set()
+
+
+status_store = StatusStore()
+
+
+def save_upload(src, dst: Path):
+    with dst.open("wb") as out:
+        # Calling fileno() on a SpooledTemporaryFile forces it to disk, so
+        # only uploads Starlette has already rolled over take the sendfile path.
+        if getattr(src, "_rolled", True):
+            try:
+                offset = 0
+                while sent := os.sendfile(out.fileno(), src.fileno(), offset, SENDFILE_CHUNK_SIZE):
+                    offset += sent
+                return
+            except (AttributeError, OSError):
+                out.seek(0)
+                out.truncate()
+                
+        src.seek(0)
+        shutil.copyfileobj(src, out)
 
 
 @router.post("/transcribe")
@@ -22,17 +80,28 @@ async def transcribe_audio(
     file: UploadFile = File(...),
     apply_correction: bool = True,
     language: str = "ja",
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    transcriber: WhisperTranscriber = Depends(get_transcriber)
 ):
-    supported_formats = ['.mp3', '.mp4', '.wav', '.m4a', '.flac', '.ogg']
     file_ext = Path(file.filename).suffix.lower()
     
-    if file_ext not in supported_formats:
+    if file_ext not in AUDIO_SIGNATURES:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file format. Supported: {', '.join(supported_formats)}"
+            detail=f"Unsupported file format. Supported: {', '.join(AUDIO_SIGNATURES)}"
         )
         
+    # Starlette has already spooled the body by now; rejecting here at least
+    # avoids copying an oversized upload into the upload directory.
+    if file.size is not None and file.size > settings.max_file_size:
+        raise HTTPException(status_code=413, detail="File too large")
+        
+    header = await file.read(16)
+    await file.seek(0)
+    
+    if not AUDIO_SIGNATURES[file_ext](header):
+        raise HTTPException(status_code=415, detail=f"File content is not valid {file_ext[1:]} audio")
+        
     task_id = str(uuid.uuid4())
     
     upload_dir = Path(settings.upload_dir)
@@ -40,42 +109,44 @@ async def transcribe_audio(
     
     temp_file = upload_dir / f"{task_id}{file_ext}"
     
-    with temp_file.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    await run_in_threadpool(save_upload, file.file, temp_file)
         
-    processing_status[task_id] = ProcessingStatus(
+    status = ProcessingStatus(
         task_id=task_id,
         status="processing",
         progress=0.0,
         message="Transcription started",
         started_at=datetime.now()
     )
+    status_store.set(status)
     
     async def process_transcription():
         try:
-            transcriber = WhisperTranscriber()
-            
-            processing_status[task_id].progress = 0.3
-            processing_status[task_id].message = "Loading model..."
+            status.progress = 0.3
+            status.message = "Loading model..."
+            status_store.set(status)
             
             result = await transcriber.transcribe_file(temp_file, apply_correction)
             
-            processing_status[task_id].progress = 0.8
-            processing_status[task_id].message = "Saving results..."
+            status.progress = 0.8
+            status.message = "Saving results..."
+            status_store.set(status)
             
             transcription_id = transcriber.save_transcription(result, db)
             
-            processing_status[task_id].status = "completed"
-            processing_status[task_id].progress = 1.0
-            processing_status[task_id].result = {"transcription_id": transcription_id}
-            processing_status[task_id].completed_at = datetime.now()
+            status.status = "completed"
+            status.progress = 1.0
+            status.result = {"transcription_id": transcription_id}
+            status.completed_at = datetime.now()
+            status_store.set(status)
             
             temp_file.unlink()
             
         except Exception as e:
-            processing_status[task_id].status = "failed"
-            processing_status[task_id].error = str(e)
-            processing_status[task_id].completed_at = datetime.now()
+            status.status = "failed"
+            status.error = str(e)
+            status.completed_at = datetime.now()
+            status_store.set(status)
             
             if temp_file.exists():
                 temp_file.unlink()
@@ -91,18 +162,20 @@ async def transcribe_audio(
 
 @router.get("/status/{task_id}")
 async def get_transcription_status(task_id: str):
-    if task_id not in processing_status:
+    status = status_store.get(task_id)
+    
+    if status is None:
         raise HTTPException(status_code=404, detail="Task not found")
         
-    return processing_status[task_id]
+    return ORJSONResponse(status.model_dump(mode="json"))
 
 
 @router.get("/{transcription_id}")
 async def get_transcription(
     transcription_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    transcriber: WhisperTranscriber = Depends(get_transcriber)
 ):
-    transcriber = WhisperTranscriber()
     result = transcriber.get_transcription(transcription_id, db)
     
     if not result:
@@ -114,14 +187,10 @@ async def get_transcription(
 @router.post("/correct-text")
 async def correct_text(
     text: str,
-    confidence_threshold: float = 0.85
+    confidence_threshold: float = 0.85,
+    transcriber: WhisperTranscriber = Depends(get_transcriber)
 ):
-    from ...services.vector_search import VectorSearchEngine, TermCorrector
-    
-    vector_engine = VectorSearchEngine()
-    corrector = TermCorrector(vector_engine)
-    
-    corrected_text, corrections = corrector.correct_text(text, confidence_threshold)
+    corrected_text, corrections = transcriber.term_corrector.correct_text(text, confidence_threshold)
     
     return {
         "original_text": text,
@@ -9,15 +9,30 @@ class Settings(BaseSettings):
     api_prefix: str = "/api/v1"
     
     database_url: str = "sqlite:///./action_items.db"
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
     
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    whisper_backend: str = "faster-whisper"
     whisper_model: str = "base"
     whisper_device: str = "cpu"
+    whisper_compute_type: str = "int8"
+    whisper_quantization: str = "dynamic_int8"
+    whisper_workers: int = 2
+    whisper_torch_compile: bool = True
     
+    ollama_base_url: str = "http://localhost:11434"
+    ollama_model: str = "llama3"
+    
+    pdf_workers: Optional[int] = None
+    
+    embedding_backend: str = "sentence-transformers"
+    onnx_model_path: str = "./data/onnx"
     faiss_index_path: str = "./data/faiss_index"
+    faiss_ivf_min_terms: int = 50000
     terminology_db_path: str = "./data/terminology.db"
     
     upload_dir: str = "./uploads"
@@ -1,13 +1,58 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, ForeignKey, Table
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Float, DateTime, Text, ForeignKey, Table, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.sql import func
 from typing import Generator
+import orjson
 from .config import settings
 
 Base = declarative_base()
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
+database_url = make_url(settings.database_url)
+
+if database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:"):
+    # SQLite gives each connection its own in-memory database, so they all
+    # have to share one; that pool takes no sizing arguments.
+    pool_options = {"poolclass": StaticPool}
+else:
+    pool_options = {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow
+    }
+
+engine = create_engine(
+    settings.database_url,
+    connect_args={"check_same_thread": False},
+    **pool_options,
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads
+)
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+if settings.database_url.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+# Indexes the models no longer declare; init_db drops them from databases
+# created before they were replaced, since create_all never removes one.
+RETIRED_INDEXES = (
+    "ix_actionitem_status_due",
+)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -39,7 +84,7 @@ class TranscriptionDB(Base):
     file_name = Column(String, nullable=False)
     original_text = Column(Text, nullable=False)
     corrected_text = Column(Text, nullable=False)
-    segments = Column(Text, nullable=False)  # JSON
+    segments = Column(JSON, nullable=False)
     duration = Column(Float, nullable=False)
     language = Column(String, default="ja")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -57,7 +102,7 @@ class ActionItemDB(Base):
     due_date = Column(DateTime(timezone=True), nullable=True)
     priority = Column(String, nullable=False)
     status = Column(String, default="pending")
-    source_segment = Column(Text, nullable=True)  # JSON
+    source_segment = Column(JSON, nullable=True)
     confidence = Column(Float, default=1.0)
     meeting_minutes_id = Column(Integer, ForeignKey('meeting_minutes.id'))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -66,18 +111,25 @@ class ActionItemDB(Base):
     meeting_minutes = relationship("MeetingMinutesDB", back_populates="action_items")
     tags = relationship("TagDB", secondary=action_item_tags, back_populates="action_items")
     
+    __table_args__ = (
+        Index("ix_ai_status_priority", "status", "priority"),
+        Index("ix_ai_assignee_status", "assignee", "status"),
+        Index("ix_ai_due_status", "due_date", "status"),
+        Index("ix_ai_minutes_status_priority", "meeting_minutes_id", "status", "priority"),
+    )
+    
 
 class MeetingMinutesDB(Base):
     __tablename__ = "meeting_minutes"
     
     id = Column(Integer, primary_key=True, index=True)
     meeting_title = Column(String, nullable=False)
-    meeting_date = Column(DateTime(timezone=True), nullable=False)
-    participants = Column(Text, nullable=False)  # JSON
+    meeting_date = Column(DateTime(timezone=True), nullable=False, index=True)
+    participants = Column(JSON, nullable=False)
     summary = Column(Text, nullable=False)
     transcription_id = Column(Integer, ForeignKey('transcriptions.id'))
-    key_decisions = Column(Text, nullable=False)  # JSON
-    next_steps = Column(Text, nullable=False)  # JSON
+    key_decisions = Column(JSON, nullable=False)
+    next_steps = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     transcription = relationship("TranscriptionDB", back_populates="meeting_minutes")
@@ -96,6 +148,14 @@ class TagDB(Base):
     action_items = relationship("ActionItemDB", secondary=action_item_tags, back_populates="tags")
 
 
+class PDFTermsCacheDB(Base):
+    __tablename__ = "pdf_terms"
+    
+    hash = Column(String, primary_key=True)
+    terms = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
@@ -105,4 +165,14 @@ def get_db() -> Generator[Session, None, None]:
 
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    
+    # create_all skips indexes on tables that already exist, so add any that
+    # were introduced after the database was first created.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+            
+    with engine.begin() as connection:
+        for index_name in RETIRED_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
\ No newline at end of file
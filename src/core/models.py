@@ -1,8 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import partial
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
 
+utc_now = partial(datetime.now, timezone.utc)
+
 
 class TermType(str, Enum):
     TECHNICAL = "technical"
@@ -21,7 +24,7 @@ class Term(BaseModel):
     term_type: TermType
     source_document: Optional[str] = None
     confidence: float = Field(ge=0.0, le=1.0)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     
     
 class TranscriptionSegment(BaseModel):
@@ -41,7 +44,7 @@ class TranscriptionResult(BaseModel):
     segments: List[TranscriptionSegment]
     duration: float
     language: str = "ja"
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     
 
 class ActionItemPriority(str, Enum):
@@ -68,8 +71,13 @@ class ActionItem(BaseModel):
     tags: List[str] = Field(default_factory=list)
     source_segment: Optional[TranscriptionSegment] = None
     confidence: float = Field(ge=0.0, le=1.0)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
+    
+
+class BulkStatusUpdate(BaseModel):
+    id: int
+    status: ActionItemStatus
     
 
 class MeetingMinutes(BaseModel):
@@ -82,7 +90,7 @@ class MeetingMinutes(BaseModel):
     action_items: List[ActionItem]
     key_decisions: List[str]
     next_steps: List[str]
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     
 
 class Tag(BaseModel):
@@ -1,72 +1,108 @@
 import re
+from collections import defaultdict
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-import json
 from ..core.models import (
     ActionItem, ActionItemPriority, ActionItemStatus,
     MeetingMinutes, TranscriptionResult, TranscriptionSegment
 )
 from ..core.database import MeetingMinutesDB, ActionItemDB, get_db
+from ..core.config import settings
+from .pattern_matching import compile_hyperscan, match_texts
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-import subprocess
-import tempfile
-from pathlib import Path
+import time
+import httpx
 
 logger = logging.getLogger(__name__)
 
 
+ACTION_PATTERNS = [
+    r'(?:〜すること|〜してください|〜お願いします|〜する必要があります)',
+    r'(?:確認|検討|準備|作成|提出|連絡|調整|実施)(?:する|して|します)',
+    r'(?:〜まで|までに)(?:〜|.*?)(?:する|完了|提出|準備)',
+    r'(?:次回|来週|今週|明日|今日).*?(?:持参|準備|確認|提出)',
+    r'(?:宿題|課題|タスク|TODO|やること)',
+]
+
+PRIORITY_KEYWORDS = {
+    ActionItemPriority.HIGH: ['至急', '緊急', '重要', '最優先', '早急', '即日', '本日中'],
+    ActionItemPriority.MEDIUM: ['なるべく', '可能な限り', '優先', '今週中', '近日中'],
+    ActionItemPriority.LOW: ['時間があれば', '余裕があれば', '後日', '将来的に']
+}
+
+ASSIGNEE_PATTERNS = [
+    re.compile(r'(\w+)さん.*?(?:お願い|担当|確認)'),
+    re.compile(r'(\w+)(?:さん)?.*?(?:が|は).*?(?:する|します)'),
+    re.compile(r'(?:担当|責任者).*?(\w+)さん'),
+]
+
+DEADLINE_PATTERNS = [
+    (re.compile(r'(\d+)月(\d+)日'), 'date'),
+    (re.compile(r'(\d+)日まで'), 'relative_day'),
+    (re.compile(r'今週中'), 'this_week'),
+    (re.compile(r'来週'), 'next_week'),
+    (re.compile(r'今月中'), 'this_month'),
+    (re.compile(r'来月'), 'next_month'),
+    (re.compile(r'明日'), 'tomorrow'),
+    (re.compile(r'本日中'), 'today'),
+]
+
+DECISION_PATTERNS = [
+    r'(?:決定|決まり|確定).*?(?:しました|します|した)',
+    r'(?:方針|方向性).*?(?:とする|にする|で進める)',
+    r'(?:承認|了承|合意).*?(?:されました|しました|を得ました)',
+]
+
+IMPORTANCE_KEYWORDS = ['決定', '重要', '確認', '合意', '方針', '計画', '予定', '課題', '問題']
+
+NEXT_MEETING_PATTERNS = [
+    re.compile(r'次回.*?(?:会議|打ち合わせ|ミーティング).*?(\d+月\d+日)'),
+    re.compile(r'(\d+月\d+日).*?(?:会議|打ち合わせ|ミーティング)'),
+]
+
+ACTION_RE = re.compile("|".join(f"(?:{p})" for p in ACTION_PATTERNS))
+DECISION_RE = re.compile("|".join(f"(?:{p})" for p in DECISION_PATTERNS))
+IMPORTANCE_RE = re.compile("|".join(map(re.escape, IMPORTANCE_KEYWORDS)))
+PRIORITY_RES = {
+    priority: re.compile("|".join(map(re.escape, keywords)))
+    for priority, keywords in PRIORITY_KEYWORDS.items()
+}
+
+ACTION_DB = compile_hyperscan(ACTION_PATTERNS)
+DECISION_DB = compile_hyperscan(DECISION_PATTERNS)
+
+OLLAMA_PROBE_TIMEOUT = 5.0
+OLLAMA_RETRY_SECONDS = 60.0
+
+
 class ActionItemExtractor:
-    def __init__(self):
-        self.action_patterns = [
-            r'(?:〜すること|〜してください|〜お願いします|〜する必要があります)',
-            r'(?:確認|検討|準備|作成|提出|連絡|調整|実施)(?:する|して|します)',
-            r'(?:〜まで|までに)(?:〜|.*?)(?:する|完了|提出|準備)',
-            r'(?:次回|来週|今週|明日|今日).*?(?:持参|準備|確認|提出)',
-            r'(?:宿題|課題|タスク|TODO|やること)',
-        ]
-        
-        self.priority_keywords = {
-            ActionItemPriority.HIGH: ['至急', '緊急', '重要', '最優先', '早急', '即日', '本日中'],
-            ActionItemPriority.MEDIUM: ['なるべく', '可能な限り', '優先', '今週中', '近日中'],
-            ActionItemPriority.LOW: ['時間があれば', '余裕があれば', '後日', '将来的に']
-        }
-        
-        self.deadline_patterns = [
-            (r'(\d+)月(\d+)日', 'date'),
-            (r'(\d+)日まで', 'relative_day'),
-            (r'今週中', 'this_week'),
-            (r'来週', 'next_week'),
-            (r'今月中', 'this_month'),
-            (r'来月', 'next_month'),
-            (r'明日', 'tomorrow'),
-            (r'本日中', 'today'),
-        ]
-        
     def extract_action_items(self, segments: List[TranscriptionSegment]) -> List[ActionItem]:
         action_items = []
         
-        for segment in segments:
-            text = segment.corrected_text or segment.text
-            
-            for pattern in self.action_patterns:
-                if re.search(pattern, text):
-                    action_item = self._create_action_item(segment, text)
-                    if action_item:
-                        action_items.append(action_item)
-                        break
+        now = datetime.now()
+        texts = [segment.corrected_text or segment.text for segment in segments]
+        matched = match_texts(texts, ACTION_DB, ACTION_RE)
+        
+        for segment, text, is_action in zip(segments, texts, matched):
+            if is_action:
+                action_item = self._create_action_item(segment, text, now)
+                if action_item:
+                    action_items.append(action_item)
                         
         return self._merge_similar_items(action_items)
     
-    def _create_action_item(self, segment: TranscriptionSegment, text: str) -> Optional[ActionItem]:
+    def _create_action_item(self, segment: TranscriptionSegment, text: str, now: Optional[datetime] = None) -> Optional[ActionItem]:
         title = self._extract_title(text)
         if not title:
             return None
             
         description = text
         assignee = self._extract_assignee(text)
-        due_date = self._extract_deadline(text)
-        priority = self._determine_priority(text)
+        now = now or datetime.now()
+        due_date = self._extract_deadline(text, now)
+        priority = self._priority_from_keywords(text) or self._priority_from_deadline(due_date, now)
         
         return ActionItem(
             title=title,
@@ -96,24 +132,18 @@ class ActionItemExtractor:
         return title[:100]
     
     def _extract_assignee(self, text: str) -> Optional[str]:
-        assignee_patterns = [
-            r'(\w+)さん.*?(?:お願い|担当|確認)',
-            r'(\w+)(?:さん)?.*?(?:が|は).*?(?:する|します)',
-            r'(?:担当|責任者).*?(\w+)さん',
-        ]
-        
-        for pattern in assignee_patterns:
-            match = re.search(pattern, text)
+        for pattern in ASSIGNEE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1) + "さん"
                 
         return None
     
-    def _extract_deadline(self, text: str) -> Optional[datetime]:
-        today = datetime.now()
+    def _extract_deadline(self, text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        today = now or datetime.now()
         
-        for pattern, pattern_type in self.deadline_patterns:
-            match = re.search(pattern, text)
+        for pattern, pattern_type in DEADLINE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 if pattern_type == 'date':
                     month = int(match.group(1))
@@ -157,26 +187,38 @@ class ActionItemExtractor:
         return None
     
     def _determine_priority(self, text: str) -> ActionItemPriority:
-        for priority, keywords in self.priority_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    return priority
-                    
-        if self._extract_deadline(text):
-            deadline = self._extract_deadline(text)
-            if deadline:
-                days_until = (deadline - datetime.now()).days
-                if days_until <= 3:
-                    return ActionItemPriority.HIGH
-                elif days_until <= 7:
-                    return ActionItemPriority.MEDIUM
-                    
+        return self._priority_from_keywords(text) or self._priority_from_deadline(self._extract_deadline(text))
+    
+    def _priority_from_keywords(self, text: str) -> Optional[ActionItemPriority]:
+        for priority, keyword_re in PRIORITY_RES.items():
+            if keyword_re.search(text):
+                return priority
+                
+        return None
+    
+    def _priority_from_deadline(self, deadline: Optional[datetime], now: Optional[datetime] = None) -> ActionItemPriority:
+        if deadline:
+            days_until = (deadline - (now or datetime.now())).days
+            if days_until <= 3:
+                return ActionItemPriority.HIGH
+            elif days_until <= 7:
+                return ActionItemPriority.MEDIUM
+                
         return ActionItemPriority.MEDIUM
     
     def _merge_similar_items(self, items: List[ActionItem]) -> List[ActionItem]:
         if len(items) <= 1:
             return items
             
+        word_sets = [set(item.title.split()) for item in items]
+        
+        # Items without a common word have zero similarity, so only items
+        # sharing at least one word are ever compared.
+        items_by_word = defaultdict(list)
+        for i, words in enumerate(word_sets):
+            for word in words:
+                items_by_word[word].append(i)
+                
         merged = []
         used = set()
         
@@ -185,13 +227,14 @@ class ActionItemExtractor:
                 continue
                 
             similar_items = [item1]
+            candidates = sorted({
+                j for word in word_sets[i] for j in items_by_word[word]
+                if j > i and j not in used
+            })
             
-            for j, item2 in enumerate(items[i+1:], i+1):
-                if j in used:
-                    continue
-                    
-                if self._are_similar(item1.title, item2.title):
-                    similar_items.append(item2)
+            for j in candidates:
+                if self._word_sets_similar(word_sets[i], word_sets[j]):
+                    similar_items.append(items[j])
                     used.add(j)
                     
             if len(similar_items) > 1:
@@ -203,9 +246,9 @@ class ActionItemExtractor:
         return merged
     
     def _are_similar(self, text1: str, text2: str) -> bool:
-        words1 = set(text1.split())
-        words2 = set(text2.split())
-        
+        return self._word_sets_similar(set(text1.split()), set(text2.split()))
+    
+    def _word_sets_similar(self, words1: set, words2: set) -> bool:
         intersection = words1.intersection(words2)
         union = words1.union(words2)
         
@@ -231,16 +274,33 @@ class ActionItemExtractor:
 class MeetingMinutesGenerator:
     def __init__(self):
         self.action_extractor = ActionItemExtractor()
-        self.ollama_available = self._check_ollama()
+        self.ollama_available = False
+        self.ollama_checked_at: Optional[float] = None
+        self.ollama_client = httpx.AsyncClient(base_url=settings.ollama_base_url, timeout=30.0)
         
-    def _check_ollama(self) -> bool:
+    async def aclose(self):
+        await self.ollama_client.aclose()
+        
+    async def check_ollama(self) -> bool:
+        # Only a success is kept; a failed probe is retried after a while so an
+        # Ollama server that comes up later is picked up.
+        if self.ollama_available:
+            return True
+        now = time.monotonic()
+        if self.ollama_checked_at is not None and now - self.ollama_checked_at < OLLAMA_RETRY_SECONDS:
+            return False
+            
+        self.ollama_checked_at = now
         try:
-            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            logger.warning("Ollama not available, using rule-based generation")
+            response = await self.ollama_client.get("/api/tags", timeout=OLLAMA_PROBE_TIMEOUT)
+            response.raise_for_status()
+        except (httpx.HTTPError, OSError) as e:
+            logger.warning(f"Ollama not available ({e}), using rule-based generation")
             return False
             
+        self.ollama_available = True
+        return True
+        
     async def generate_minutes(
         self,
         transcription: TranscriptionResult,
@@ -251,8 +311,9 @@ class MeetingMinutesGenerator:
         
         action_items = self.action_extractor.extract_action_items(transcription.segments)
         
-        summary = await self._generate_summary(transcription)
-        key_decisions = self._extract_key_decisions(transcription)
+        sentences = transcription.corrected_text.split('。')
+        summary = await self._generate_summary(transcription, sentences)
+        key_decisions = self._extract_key_decisions(transcription, sentences)
         next_steps = self._extract_next_steps(transcription, action_items)
         
         return MeetingMinutes(
@@ -266,13 +327,13 @@ class MeetingMinutesGenerator:
             next_steps=next_steps
         )
     
-    async def _generate_summary(self, transcription: TranscriptionResult) -> str:
-        if self.ollama_available:
-            return await self._generate_summary_with_llm(transcription)
+    async def _generate_summary(self, transcription: TranscriptionResult, sentences: Optional[List[str]] = None) -> str:
+        if await self.check_ollama():
+            return await self._generate_summary_with_llm(transcription, sentences)
         else:
-            return self._generate_summary_rule_based(transcription)
+            return self._generate_summary_rule_based(transcription, sentences)
             
-    async def _generate_summary_with_llm(self, transcription: TranscriptionResult) -> str:
+    async def _generate_summary_with_llm(self, transcription: TranscriptionResult, sentences: Optional[List[str]] = None) -> str:
         prompt = f"""以下の会議記録を要約してください。重要なポイントを3-5個の箇条書きにしてください：
 
 {transcription.corrected_text[:2000]}
@@ -280,42 +341,35 @@ class MeetingMinutesGenerator:
 要約："""
         
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-                f.write(prompt)
-                temp_path = f.name
-                
-            result = subprocess.run(
-                ['ollama', 'run', 'llama3', f'< {temp_path}'],
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
+            response = await self.ollama_client.post(
+                "/api/generate",
+                json={"model": settings.ollama_model, "prompt": prompt, "stream": False}
             )
+            response.raise_for_status()
+            return response.json()["response"].strip()
             
-            Path(temp_path).unlink()
-            
-            if result.returncode == 0:
-                return result.stdout.strip()
-                
+        except (httpx.HTTPError, OSError) as e:
+            # Probe again before the next summary instead of assuming it is up.
+            self.ollama_available = False
+            logger.error(f"LLM summary generation failed: {e}")
         except Exception as e:
             logger.error(f"LLM summary generation failed: {e}")
             
-        return self._generate_summary_rule_based(transcription)
+        return self._generate_summary_rule_based(transcription, sentences)
     
-    def _generate_summary_rule_based(self, transcription: TranscriptionResult) -> str:
+    def _generate_summary_rule_based(self, transcription: TranscriptionResult, sentences: Optional[List[str]] = None) -> str:
         text = transcription.corrected_text
-        sentences = text.split('。')
-        
+        if sentences is None:
+            sentences = text.split('。')
+            
         important_sentences = []
-        importance_keywords = ['決定', '重要', '確認', '合意', '方針', '計画', '予定', '課題', '問題']
         
         for sentence in sentences:
-            if any(keyword in sentence for keyword in importance_keywords):
+            if IMPORTANCE_RE.search(sentence):
                 important_sentences.append(sentence.strip() + '。')
-                
-        if len(important_sentences) > 5:
-            important_sentences = important_sentences[:5]
-            
+                if len(important_sentences) == 5:
+                    break
+                    
         if not important_sentences:
             words = text.split()
             if len(words) > 100:
@@ -326,22 +380,17 @@ class MeetingMinutesGenerator:
             
         return '\n'.join([f"• {sent}" for sent in important_sentences])
     
-    def _extract_key_decisions(self, transcription: TranscriptionResult) -> List[str]:
+    def _extract_key_decisions(self, transcription: TranscriptionResult, sentences: Optional[List[str]] = None) -> List[str]:
         decisions = []
-        decision_patterns = [
-            r'(?:決定|決まり|確定).*?(?:しました|します|した)',
-            r'(?:方針|方向性).*?(?:とする|にする|で進める)',
-            r'(?:承認|了承|合意).*?(?:されました|しました|を得ました)',
-        ]
         
-        text = transcription.corrected_text
-        sentences = text.split('。')
+        if sentences is None:
+            sentences = transcription.corrected_text.split('。')
+            
+        matched = match_texts(sentences, DECISION_DB, DECISION_RE)
         
-        for sentence in sentences:
-            for pattern in decision_patterns:
-                if re.search(pattern, sentence):
-                    decisions.append(sentence.strip() + '。')
-                    break
+        for sentence, is_decision in zip(sentences, matched):
+            if is_decision:
+                decisions.append(sentence.strip() + '。')
                     
         return decisions[:5]
     
@@ -357,13 +406,8 @@ class MeetingMinutesGenerator:
                 step += f" - {item.due_date.strftime('%Y/%m/%d')}まで"
             next_steps.append(step)
             
-        next_meeting_patterns = [
-            r'次回.*?(?:会議|打ち合わせ|ミーティング).*?(\d+月\d+日)',
-            r'(\d+月\d+日).*?(?:会議|打ち合わせ|ミーティング)',
-        ]
-        
-        for pattern in next_meeting_patterns:
-            match = re.search(pattern, transcription.corrected_text)
+        for pattern in NEXT_MEETING_PATTERNS:
+            match = pattern.search(transcription.corrected_text)
             if match:
                 next_steps.append(f"次回会議: {match.group(1)}")
                 break
@@ -374,31 +418,34 @@ class MeetingMinutesGenerator:
         db_minutes = MeetingMinutesDB(
             meeting_title=minutes.meeting_title,
             meeting_date=minutes.meeting_date,
-            participants=json.dumps(minutes.participants, ensure_ascii=False),
+            participants=minutes.participants,
             summary=minutes.summary,
             transcription_id=minutes.transcription_id,
-            key_decisions=json.dumps(minutes.key_decisions, ensure_ascii=False),
-            next_steps=json.dumps(minutes.next_steps, ensure_ascii=False)
+            key_decisions=minutes.key_decisions,
+            next_steps=minutes.next_steps
         )
         
         db.add(db_minutes)
-        db.commit()
-        db.refresh(db_minutes)
+        db.flush()
+        minutes_id = db_minutes.id
         
-        for action_item in minutes.action_items:
-            db_action = ActionItemDB(
-                title=action_item.title,
-                description=action_item.description,
-                assignee=action_item.assignee,
-                due_date=action_item.due_date,
-                priority=action_item.priority.value,
-                status=action_item.status.value,
-                source_segment=json.dumps(action_item.source_segment.dict() if action_item.source_segment else None, ensure_ascii=False),
-                confidence=action_item.confidence,
-                meeting_minutes_id=db_minutes.id
-            )
-            db.add(db_action)
+        rows = [
+            {
+                "title": action_item.title,
+                "description": action_item.description,
+                "assignee": action_item.assignee,
+                "due_date": action_item.due_date,
+                "priority": action_item.priority.value,
+                "status": action_item.status.value,
+                "source_segment": action_item.source_segment.dict() if action_item.source_segment else None,
+                "confidence": action_item.confidence,
+                "meeting_minutes_id": minutes_id
+            }
+            for action_item in minutes.action_items
+        ]
+        if rows:
+            db.execute(insert(ActionItemDB), rows)
             
         db.commit()
         
-        return db_minutes.id
\ No newline at end of file
+        return minutes_id
\ No newline at end of file
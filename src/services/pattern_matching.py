@@ -0,0 +1,133 @@
+import re
+import threading
+import numpy as np
+from bisect import bisect_right
+from typing import List, Set
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+_scratch = threading.local()
+
+
+def compile_hyperscan(patterns: List[str], flags: int = 0):
+    if hyperscan is None:
+        return None
+        
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[p.encode() for p in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | flags] * len(patterns)
+    )
+    return database
+
+
+def compile_keywords(keywords: List[str]):
+    if hyperscan is None:
+        return None
+    return compile_hyperscan([re.escape(k) for k in keywords], hyperscan.HS_FLAG_SINGLEMATCH)
+
+
+def compile_literals(literals: List[str]):
+    # Empty strings would match at every offset, which hyperscan rejects;
+    # find_literals handles them without the database.
+    if hyperscan is None:
+        return None
+    ids = [i for i, literal in enumerate(literals) if literal]
+    if not ids:
+        return None
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[re.escape(literals[i]).encode() for i in ids],
+        ids=ids,
+        elements=len(ids),
+        flags=[hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(ids)
+    )
+    return database
+
+
+def _scan(database, data: bytes, on_match):
+    # Scratch space cannot be shared between concurrent scans, and the
+    # databases are used from both the event loop and the threadpool.
+    scratches = getattr(_scratch, "by_database", None)
+    if scratches is None:
+        scratches = _scratch.by_database = {}
+    owner, scratch = scratches.get(id(database), (None, None))
+    if owner is not database:
+        scratch = hyperscan.Scratch(database)
+        scratches[id(database)] = (database, scratch)
+    database.scan(data, match_event_handler=on_match, scratch=scratch)
+
+
+def match_texts(texts: List[str], database, fallback: re.Pattern) -> List[bool]:
+    if database is None:
+        return [bool(fallback.search(text)) for text in texts]
+        
+    # Texts are joined with newlines, which '.' never matches, so a match
+    # cannot span two texts and its end offset identifies the text it is in.
+    encoded = [text.encode() for text in texts]
+    starts = []
+    offset = 0
+    for data in encoded:
+        starts.append(offset)
+        offset += len(data) + 1
+        
+    matched = [False] * len(texts)
+    
+    def on_match(pattern_id, start, end, flags, context):
+        matched[bisect_right(starts, end - 1) - 1] = True
+        
+    _scan(database, b"\n".join(encoded), on_match)
+    return matched
+
+
+def match_keywords(text: str, keywords: List[str], database) -> Set[int]:
+    if database is None:
+        return {i for i, keyword in enumerate(keywords) if keyword in text}
+        
+    matched = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        matched.add(pattern_id)
+        
+    _scan(database, text.encode(), on_match)
+    return matched
+
+
+def find_literals(text: str, literals: List[str], database) -> List[List[int]]:
+    # Every (possibly overlapping) occurrence of each literal, as character
+    # offsets in ascending order, the same positions str.find steps through.
+    if database is None:
+        positions = []
+        for literal in literals:
+            found = []
+            pos = text.find(literal)
+            while pos != -1:
+                found.append(pos)
+                pos = text.find(literal, pos + 1)
+            positions.append(found)
+        return positions
+        
+    positions = [[] for _ in literals]
+    for i, literal in enumerate(literals):
+        if not literal:
+            positions[i] = list(range(len(text) + 1))
+            
+    data = text.encode()
+    lengths = [len(literal.encode()) for literal in literals]
+    ends = []
+    
+    def on_match(pattern_id, start, end, flags, context):
+        ends.append((pattern_id, end))
+        
+    _scan(database, data, on_match)
+    if ends:
+        # Map byte offsets back to characters by counting UTF-8 lead bytes.
+        char_index = np.cumsum((np.frombuffer(data, dtype=np.uint8) & 0xC0) != 0x80) - 1
+        for pattern_id, end in ends:
+            positions[pattern_id].append(int(char_index[end - lengths[pattern_id]]))
+    return positions
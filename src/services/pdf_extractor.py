@@ -1,27 +1,84 @@
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set, Tuple, Optional, Callable
 import PyPDF2
 import pdfplumber
 from pathlib import Path
 import logging
 from ..core.models import Term, TermType
-from ..core.database import TermDB, get_db
+from ..core.database import TermDB, SessionLocal
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import MeCab
-from collections import Counter
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+PAGES_PER_WORKER = 50
+
+READING_CACHE_SIZE = 4096
+
+TERM_LOOKUP_BATCH_SIZE = 500
+
+MECAB_BOS_EOS = (MeCab.MECAB_BOS_NODE, MeCab.MECAB_EOS_NODE)
+
+_worker_extractor = None
+
+
+def _init_worker():
+    global _worker_extractor
+    # Directory workers already use every core, so each extracts its pages inline.
+    _worker_extractor = PDFTermExtractor(page_workers=1)
+
+
+def _extract_terms_in_worker(pdf_path: Path) -> List[Term]:
+    return _worker_extractor.extract_terms_from_pdf(pdf_path)
+
+
+def _join_page_text(pages) -> str:
+    text = ""
+    for page in pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text + "\n"
+    return text
+
+
+def _extract_page_range(pdf_path: Path, start: int, stop: int) -> str:
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        return _join_page_text(pdf.pages)
+
+
+def _spawn_pool(workers: int, **kwargs) -> ProcessPoolExecutor:
+    # Spawned rather than forked: the API process holds torch/faiss threads
+    # and the MeCab lock, none of which survive a fork safely.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        **kwargs
+    )
+
 
 class PDFTermExtractor:
-    def __init__(self):
+    def __init__(self, page_workers: Optional[int] = None):
+        self.page_workers = page_workers or settings.pdf_workers or os.cpu_count() or 1
         self.mecab = MeCab.Tagger()
+        self.mecab_lock = threading.Lock()
+        self.get_reading = lru_cache(maxsize=READING_CACHE_SIZE)(self._get_reading)
         self.construction_patterns = [
             r'[ァ-ヴー]+(?:工事|作業|施工|建設|建築)',
             r'(?:鉄筋|鉄骨|コンクリート|アスファルト|基礎|躯体|仕上げ|防水|塗装|電気|配管|空調|設備)',
             r'(?:図面|設計|施工図|仕様書|工程表|安全)',
             r'[0-9]+(?:mm|cm|m|kg|t|㎡|m2|m3|MPa|N)',
         ]
+        # Kept as separate patterns rather than one alternation: they overlap
+        # (コンクリート工事 / コンクリート), and each overlapping hit counts
+        # towards the frequency boost below.
+        self.compiled_patterns = [re.compile(p) for p in self.construction_patterns]
         
         self.term_types_keywords = {
             TermType.TECHNICAL: ['工法', '技術', '方法', '仕様', '規格', '基準'],
@@ -36,10 +93,13 @@ class PDFTermExtractor:
         
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                page_count = len(pdf.pages)
+                workers = min(self.page_workers, page_count // PAGES_PER_WORKER)
+                if workers <= 1:
+                    text = _join_page_text(pdf.pages)
+                    
+            if workers > 1:
+                text = self._extract_pages_parallel(pdf_path, page_count, workers)
         except Exception as e:
             logger.warning(f"pdfplumber failed for {pdf_path}: {e}")
             
@@ -54,13 +114,37 @@ class PDFTermExtractor:
                 
         return text
     
-    def classify_term_type(self, term: str, context: str = "") -> TermType:
-        combined_text = f"{term} {context}".lower()
+    def _extract_pages_parallel(self, pdf_path: Path, page_count: int, workers: int) -> str:
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        with _spawn_pool(workers) as executor:
+            chunks = executor.map(_extract_page_range, [pdf_path] * workers, bounds[:-1], bounds[1:])
+            return "".join(chunks)
+    
+    def context_keyword_hits(self, context: str) -> Dict[TermType, Set[str]]:
+        context = context.lower()
+        return {
+            term_type: {keyword for keyword in keywords if keyword in context}
+            for term_type, keywords in self.term_types_keywords.items()
+        }
+    
+    def classify_term_type(
+        self,
+        term: str,
+        context: str = "",
+        context_hits: Optional[Dict[TermType, Set[str]]] = None
+    ) -> TermType:
+        # Keywords contain no spaces, so matching "term context" is the same
+        # as matching either part, and the context side can be computed once.
+        if context_hits is None:
+            context_hits = self.context_keyword_hits(context)
+        term = term.lower()
         
         type_scores = {}
         for term_type, keywords in self.term_types_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in combined_text)
-            type_scores[term_type] = score
+            hits = context_hits[term_type]
+            type_scores[term_type] = len(hits) + sum(
+                1 for keyword in keywords if keyword not in hits and keyword in term
+            )
             
         if max(type_scores.values()) > 0:
             return max(type_scores, key=type_scores.get)
@@ -69,25 +153,11 @@ class PDFTermExtractor:
     def extract_construction_terms(self, text: str) -> List[Tuple[str, float]]:
         terms = []
         
-        lines = text.split('\n')
-        for line in lines:
-            for pattern in self.construction_patterns:
-                matches = re.findall(pattern, line)
-                for match in matches:
-                    if len(match) >= 2:
-                        terms.append((match, 0.8))
-        
-        parsed = self.mecab.parse(text)
-        lines = parsed.split('\n')
+        for pattern in self.compiled_patterns:
+            terms.extend((match, 0.8) for match in pattern.findall(text) if len(match) >= 2)
         
         compound_noun = []
-        for line in lines:
-            if '\t' not in line:
-                continue
-                
-            surface, features = line.split('\t')
-            feature_list = features.split(',')
-            
+        for surface, feature_list in self._parse(text):
             if feature_list[0] == '名詞':
                 if feature_list[1] in ['固有名詞', '一般', 'サ変接続']:
                     compound_noun.append(surface)
@@ -104,15 +174,23 @@ class PDFTermExtractor:
                         terms.append((term, 0.6))
                 compound_noun = []
         
-        term_counter = Counter([t[0] for t in terms])
-        filtered_terms = []
+        # Collapsed to one entry per term with its best confidence; the
+        # frequency boost is monotonic, so boosting the max is the same as
+        # taking the max of the boosted values.
+        stats = {}
         for term, confidence in terms:
-            if term_counter[term] >= 2:
-                filtered_terms.append((term, min(confidence * 1.2, 1.0)))
-            elif len(term) >= 4:
-                filtered_terms.append((term, confidence))
+            entry = stats.get(term)
+            if entry is None:
+                stats[term] = [confidence, 1]
+            else:
+                entry[0] = max(entry[0], confidence)
+                entry[1] += 1
                 
-        return list(set(filtered_terms))
+        return [
+            (term, min(confidence * 1.2, 1.0) if count >= 2 else confidence)
+            for term, (confidence, count) in stats.items()
+            if count >= 2 or len(term) >= 4
+        ]
     
     def extract_terms_from_pdf(self, pdf_path: Path, source_name: str = None) -> List[Term]:
         if source_name is None:
@@ -121,11 +199,12 @@ class PDFTermExtractor:
         text = self.extract_text_from_pdf(pdf_path)
         raw_terms = self.extract_construction_terms(text)
         
+        context_hits = self.context_keyword_hits(text[:500])
         terms = []
         for term_text, confidence in raw_terms:
-            term_type = self.classify_term_type(term_text, text[:500])
+            term_type = self.classify_term_type(term_text, context_hits=context_hits)
             
-            reading = self._get_reading(term_text)
+            reading = self.get_reading(term_text)
             
             term = Term(
                 term=term_text,
@@ -138,16 +217,22 @@ class PDFTermExtractor:
             
         return terms
     
+    def _parse(self, text: str) -> List[Tuple[str, List[str]]]:
+        # MeCab.Tagger is not thread-safe and this extractor is shared by
+        # background tasks running in the threadpool.
+        tokens = []
+        with self.mecab_lock:
+            node = self.mecab.parseToNode(text)
+            while node:
+                if node.stat not in MECAB_BOS_EOS:
+                    tokens.append((node.surface, node.feature.split(',')))
+                node = node.next
+        return tokens
+    
     def _get_reading(self, text: str) -> str:
-        parsed = self.mecab.parse(text)
         readings = []
         
-        for line in parsed.split('\n'):
-            if '\t' not in line:
-                continue
-            surface, features = line.split('\t')
-            feature_list = features.split(',')
-            
+        for surface, feature_list in self._parse(text):
             if len(feature_list) >= 8 and feature_list[7] != '*':
                 readings.append(feature_list[7])
             else:
@@ -156,49 +241,96 @@ class PDFTermExtractor:
         return ''.join(readings)
     
     def save_terms_to_db(self, terms: List[Term], db: Session):
+        best_terms = {}
         for term in terms:
-            existing = db.query(TermDB).filter(TermDB.term == term.term).first()
+            if term.term not in best_terms or term.confidence > best_terms[term.term].confidence:
+                best_terms[term.term] = term
+                
+        # terms.term is indexed but not unique, so there is no conflict target
+        # for an upsert; existing rows are looked up in chunks instead.
+        names = list(best_terms)
+        existing = {}
+        for i in range(0, len(names), TERM_LOOKUP_BATCH_SIZE):
+            for db_term in db.query(TermDB).filter(TermDB.term.in_(names[i:i + TERM_LOOKUP_BATCH_SIZE])):
+                existing.setdefault(db_term.term, db_term)
+                
+        new_rows = []
+        for name, term in best_terms.items():
+            db_term = existing.get(name)
             
-            if existing:
-                if term.confidence > existing.confidence:
-                    existing.confidence = term.confidence
-                    existing.source_document = term.source_document
-                    existing.term_type = term.term_type.value
-            else:
-                db_term = TermDB(
-                    term=term.term,
-                    reading=term.reading,
-                    definition=term.definition,
-                    term_type=term.term_type.value,
-                    source_document=term.source_document,
-                    confidence=term.confidence
-                )
-                db.add(db_term)
+            if db_term is None:
+                new_rows.append({
+                    "term": term.term,
+                    "reading": term.reading,
+                    "definition": term.definition,
+                    "term_type": term.term_type.value,
+                    "source_document": term.source_document,
+                    "confidence": term.confidence
+                })
+            elif term.confidence > db_term.confidence:
+                db_term.confidence = term.confidence
+                db_term.source_document = term.source_document
+                db_term.term_type = term.term_type.value
                 
+        if new_rows:
+            db.execute(insert(TermDB), new_rows)
         db.commit()
     
-    def process_pdf_directory(self, directory: Path) -> Dict[str, int]:
+    def process_pdf_directory(
+        self,
+        directory: Path,
+        workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, int]:
         results = {
             "processed_files": 0,
             "extracted_terms": 0,
             "errors": []
         }
         
-        pdf_files = list(directory.glob("*.pdf"))
+        pdf_files = sorted(directory.glob("*.pdf"))
+        workers = min(workers or settings.pdf_workers or os.cpu_count() or 1, max(len(pdf_files), 1))
         
-        for pdf_file in pdf_files:
-            try:
+        db = SessionLocal()
+        try:
+            for done, (pdf_file, terms, error) in enumerate(self._extract_files(pdf_files, workers), 1):
+                try:
+                    if error is not None:
+                        raise error
+                        
+                    self.save_terms_to_db(terms, db)
+                    
+                    results["processed_files"] += 1
+                    results["extracted_terms"] += len(terms)
+                    
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Error processing {pdf_file.name}: {e}")
+                    results["errors"].append(f"{pdf_file.name}: {str(e)}")
+                    
+                if progress_callback:
+                    progress_callback(done, len(pdf_files), pdf_file.name)
+        finally:
+            db.close()
+            
+        return results
+    
+    def _extract_files(self, pdf_files: List[Path], workers: int):
+        if workers <= 1:
+            for pdf_file in pdf_files:
                 logger.info(f"Processing {pdf_file.name}")
-                terms = self.extract_terms_from_pdf(pdf_file)
-                
-                db = next(get_db())
-                self.save_terms_to_db(terms, db)
-                
-                results["processed_files"] += 1
-                results["extracted_terms"] += len(terms)
-                
-            except Exception as e:
-                logger.error(f"Error processing {pdf_file.name}: {e}")
-                results["errors"].append(f"{pdf_file.name}: {str(e)}")
-                
-        return results
\ No newline at end of file
+                try:
+                    yield pdf_file, self.extract_terms_from_pdf(pdf_file), None
+                except Exception as e:
+                    yield pdf_file, None, e
+            return
+            
+        with _spawn_pool(workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(_extract_terms_in_worker, f): f for f in pdf_files}
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                logger.info(f"Processed {pdf_file.name}")
+                try:
+                    yield pdf_file, future.result(), None
+                except Exception as e:
+                    yield pdf_file, None, e
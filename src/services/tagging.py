@@ -1,14 +1,17 @@
 import re
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Any
 from collections import Counter
 import logging
 from ..core.models import ActionItem, Tag
-from ..core.database import TagDB, ActionItemDB, get_db
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from ..core.database import TagDB, ActionItemDB, action_item_tags, get_db
+from .pattern_matching import compile_keywords, match_keywords
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, delete, func, insert, select
 
 logger = logging.getLogger(__name__)
 
+TAG_BATCH_SIZE = 500
+
 
 class SmartTagger:
     def __init__(self):
@@ -72,16 +75,34 @@ class SmartTagger:
             "設備工事": ["設備", "電気", "空調", "衛生", "配管"],
         }
         
+        keyword_tags = [
+            (keyword, tag_name)
+            for tag_name, rule in self.tag_rules.items()
+            for keyword in rule["keywords"]
+        ] + [
+            (keyword, phase_name)
+            for phase_name, keywords in self.phase_tags.items()
+            for keyword in keywords
+        ]
+        self.keywords = [keyword for keyword, _ in keyword_tags]
+        self.keyword_tag_names = [tag_name for _, tag_name in keyword_tags]
+        self.keyword_db = compile_keywords(self.keywords)
+        
+        self.rule_tag_info = {
+            tag_name: {
+                "category": rule["category"],
+                "color": rule["color"],
+                "description": f"{tag_name}に関連するアクションアイテム"
+            }
+            for tag_name, rule in self.tag_rules.items()
+        }
+        
     def extract_tags(self, action_item: ActionItem) -> List[str]:
         text = f"{action_item.title} {action_item.description}".lower()
-        tags = []
+        matched = self._match_tag_names(text)
         
-        for tag_name, rule in self.tag_rules.items():
-            if any(keyword in text for keyword in rule["keywords"]):
-                tags.append(tag_name)
-                
-        phase_tags = self._extract_phase_tags(text)
-        tags.extend(phase_tags)
+        tags = [tag_name for tag_name in self.tag_rules if tag_name in matched]
+        tags.extend(phase_name for phase_name in self.phase_tags if phase_name in matched)
         
         priority_tag = self._get_priority_tag(action_item)
         if priority_tag:
@@ -97,14 +118,15 @@ class SmartTagger:
         
         return tags[:10]
     
+    def _match_tag_names(self, text: str) -> Set[str]:
+        return {
+            self.keyword_tag_names[i]
+            for i in match_keywords(text, self.keywords, self.keyword_db)
+        }
+    
     def _extract_phase_tags(self, text: str) -> List[str]:
-        phase_tags = []
-        
-        for phase_name, keywords in self.phase_tags.items():
-            if any(keyword in text for keyword in keywords):
-                phase_tags.append(phase_name)
-                
-        return phase_tags
+        matched = self._match_tag_names(text)
+        return [phase_name for phase_name in self.phase_tags if phase_name in matched]
     
     def _get_priority_tag(self, action_item: ActionItem) -> str:
         priority_map = {
@@ -115,37 +137,39 @@ class SmartTagger:
         return priority_map.get(action_item.priority.value, "")
     
     def create_or_get_tags(self, tag_names: List[str], db: Session) -> List[TagDB]:
-        tags = []
-        
-        for tag_name in tag_names:
-            existing_tag = db.query(TagDB).filter(TagDB.name == tag_name).first()
+        if not tag_names:
+            return []
             
-            if existing_tag:
-                tags.append(existing_tag)
-            else:
+        tags_by_name = {
+            tag.name: tag
+            for tag in db.query(TagDB).filter(TagDB.name.in_(tag_names)).all()
+        }
+        
+        new_tags = []
+        for tag_name in dict.fromkeys(tag_names):
+            if tag_name not in tags_by_name:
                 tag_info = self._get_tag_info(tag_name)
-                new_tag = TagDB(
+                tags_by_name[tag_name] = TagDB(
                     name=tag_name,
                     category=tag_info["category"],
                     color=tag_info["color"],
                     description=tag_info["description"]
                 )
-                db.add(new_tag)
-                db.commit()
-                db.refresh(new_tag)
-                tags.append(new_tag)
+                new_tags.append(tags_by_name[tag_name])
                 
-        return tags
+        if new_tags:
+            # Flushed rather than committed: callers commit once they have
+            # linked the tags, and a commit here would expire every instance.
+            db.add_all(new_tags)
+            db.flush()
+            
+        return [tags_by_name[tag_name] for tag_name in tag_names]
     
     def _get_tag_info(self, tag_name: str) -> Dict[str, str]:
-        for rule_name, rule in self.tag_rules.items():
-            if tag_name == rule_name:
-                return {
-                    "category": rule["category"],
-                    "color": rule["color"],
-                    "description": f"{rule_name}に関連するアクションアイテム"
-                }
-                
+        rule_info = self.rule_tag_info.get(tag_name)
+        if rule_info:
+            return rule_info
+            
         if tag_name.startswith("担当:"):
             return {
                 "category": "assignee",
@@ -173,24 +197,26 @@ class SmartTagger:
             "description": tag_name
         }
     
-    def tag_action_item(self, action_item_id: int, db: Session):
-        action_item = db.query(ActionItemDB).filter(ActionItemDB.id == action_item_id).first()
-        
-        if not action_item:
-            logger.error(f"Action item {action_item_id} not found")
-            return
-            
-        action_model = ActionItem(
+    def _to_action_model(self, action_item: ActionItemDB) -> ActionItem:
+        return ActionItem(
             id=action_item.id,
             title=action_item.title,
             description=action_item.description,
             assignee=action_item.assignee,
             due_date=action_item.due_date,
             priority=action_item.priority,
-            status=action_item.status
+            status=action_item.status,
+            confidence=action_item.confidence
         )
+    
+    def tag_action_item(self, action_item_id: int, db: Session):
+        action_item = db.query(ActionItemDB).filter(ActionItemDB.id == action_item_id).first()
         
-        tag_names = self.extract_tags(action_model)
+        if not action_item:
+            logger.error(f"Action item {action_item_id} not found")
+            return
+            
+        tag_names = self.extract_tags(self._to_action_model(action_item))
         
         tags = self.create_or_get_tags(tag_names, db)
         
@@ -199,19 +225,64 @@ class SmartTagger:
         
         logger.info(f"Tagged action item {action_item_id} with {len(tags)} tags")
     
-    def tag_all_action_items(self, db: Session) -> Dict[str, int]:
-        action_items = db.query(ActionItemDB).all()
+    def tag_action_items_bulk(self, action_item_ids: List[int], db: Session) -> int:
+        if not action_item_ids:
+            return 0
+            
+        action_items = db.query(ActionItemDB).filter(ActionItemDB.id.in_(action_item_ids)).all()
+        
+        return self._replace_tags(action_items, db)
+    
+    def _replace_tags(self, action_items: List[ActionItemDB], db: Session) -> int:
+        tag_names_by_item = {
+            item.id: self.extract_tags(self._to_action_model(item))
+            for item in action_items
+        }
+        
+        unique_names = list(dict.fromkeys(
+            name for names in tag_names_by_item.values() for name in names
+        ))
+        tags_by_name = {tag.name: tag for tag in self.create_or_get_tags(unique_names, db)}
+        
+        rows = [
+            {"action_item_id": item_id, "tag_id": tags_by_name[name].id}
+            for item_id, names in tag_names_by_item.items()
+            for name in names
+        ]
         
+        db.execute(
+            delete(action_item_tags).where(
+                action_item_tags.c.action_item_id.in_(list(tag_names_by_item))
+            )
+        )
+        if rows:
+            db.execute(insert(action_item_tags), rows)
+        db.commit()
+        
+        logger.info(f"Tagged {len(tag_names_by_item)} action items with {len(rows)} tags")
+        
+        return len(rows)
+    
+    def tag_all_action_items(self, db: Session) -> Dict[str, int]:
         tagged_count = 0
         tag_count = 0
+        last_id = 0
         
-        for action_item in action_items:
+        while True:
+            action_items = db.query(ActionItemDB).filter(
+                ActionItemDB.id > last_id
+            ).order_by(ActionItemDB.id).limit(TAG_BATCH_SIZE).all()
+            
+            if not action_items:
+                break
+                
+            last_id = action_items[-1].id
             try:
-                self.tag_action_item(action_item.id, db)
-                tagged_count += 1
-                tag_count += len(action_item.tags)
+                tag_count += self._replace_tags(action_items, db)
+                tagged_count += len(action_items)
             except Exception as e:
-                logger.error(f"Error tagging action item {action_item.id}: {e}")
+                db.rollback()
+                logger.error(f"Error tagging action items up to {last_id}: {e}")
                 
         return {
             "tagged_items": tagged_count,
@@ -219,21 +290,21 @@ class SmartTagger:
         }
     
     def find_related_items(self, action_item_id: int, db: Session, limit: int = 5) -> List[ActionItemDB]:
-        action_item = db.query(ActionItemDB).filter(ActionItemDB.id == action_item_id).first()
-        
-        if not action_item or not action_item.tags:
-            return []
-            
-        tag_ids = [tag.id for tag in action_item.tags]
+        source_tag_ids = select(action_item_tags.c.tag_id).where(
+            action_item_tags.c.action_item_id == action_item_id
+        )
+        overlap = func.count(TagDB.id).label("overlap")
         
-        related_items = db.query(ActionItemDB).join(ActionItemDB.tags).filter(
+        rows = db.query(ActionItemDB, overlap).join(ActionItemDB.tags).filter(
             and_(
                 ActionItemDB.id != action_item_id,
-                TagDB.id.in_(tag_ids)
+                TagDB.id.in_(source_tag_ids)
             )
-        ).distinct().limit(limit).all()
+        ).options(selectinload(ActionItemDB.tags)).group_by(ActionItemDB.id).order_by(
+            overlap.desc(), ActionItemDB.id
+        ).limit(limit).all()
         
-        return related_items
+        return [item for item, _ in rows]
     
     def get_tag_statistics(self, db: Session) -> Dict[str, Any]:
         tags = db.query(TagDB).all()
@@ -258,12 +329,13 @@ class SmartTagger:
         return stats
     
     def search_by_tags(self, tag_names: List[str], db: Session) -> List[ActionItemDB]:
-        query = db.query(ActionItemDB).join(ActionItemDB.tags)
+        tag_names = list(set(tag_names))
         
-        for tag_name in tag_names:
-            query = query.filter(TagDB.name == tag_name)
-            
-        return query.distinct().all()
+        return db.query(ActionItemDB).join(ActionItemDB.tags).filter(
+            TagDB.name.in_(tag_names)
+        ).group_by(ActionItemDB.id).having(
+            func.count(func.distinct(TagDB.id)) == len(tag_names)
+        ).all()
     
     def suggest_tags(self, partial_text: str, db: Session, limit: int = 10) -> List[str]:
         tags = db.query(TagDB).filter(
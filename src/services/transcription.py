@@ -1,114 +1,239 @@
 import whisper
 import torch
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Union
 import numpy as np
 import logging
-import json
 from datetime import datetime
+from itertools import islice
 from ..core.models import TranscriptionSegment, TranscriptionResult
 from ..core.database import TranscriptionDB, get_db
 from ..core.config import settings
 from .vector_search import TermCorrector, VectorSearchEngine
 from sqlalchemy.orm import Session
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
 logger = logging.getLogger(__name__)
 
+INITIAL_PROMPT = "これは建設現場での会議の音声です。専門用語に注意してください。"
+CORRECTION_BATCH_SIZE = 32
+
+
+def quantize_dynamic_int8(model: whisper.model.Whisper) -> whisper.model.Whisper:
+    # quantize_dynamic matches module types exactly, so whisper's Linear
+    # subclass has to be rebound to nn.Linear before it gets swapped out.
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+            
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
 
 class WhisperTranscriber:
-    def __init__(self):
+    def __init__(self, vector_engine: Optional[VectorSearchEngine] = None):
         self.model = None
+        self.backend = None
+        self.initial_prompt = INITIAL_PROMPT
         self.device = settings.whisper_device
         self.model_name = settings.whisper_model
-        self.vector_engine = VectorSearchEngine()
+        self.vector_engine = vector_engine or VectorSearchEngine()
         self.term_corrector = TermCorrector(self.vector_engine)
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.executor = ThreadPoolExecutor(max_workers=settings.whisper_workers)
+        self.model_lock = threading.Lock()
         
     def load_model(self):
-        if self.model is None:
-            logger.info(f"Loading Whisper model: {self.model_name}")
-            self.model = whisper.load_model(self.model_name, device=self.device)
+        with self.model_lock:
+            if self.model is not None:
+                return
+                
+            if settings.whisper_backend == "faster-whisper" and WhisperModel is not None:
+                self.backend = "faster-whisper"
+                self.model = self._load_faster_whisper()
+                # faster-whisper takes prompt token ids as-is, so the prompt is
+                # encoded once (the same way it would encode the string).
+                self.initial_prompt = self.model.hf_tokenizer.encode(
+                    " " + INITIAL_PROMPT.strip(), add_special_tokens=False
+                ).ids
+            else:
+                self.backend = "openai-whisper"
+                self.model = self._load_openai_whisper()
+                self.initial_prompt = INITIAL_PROMPT
             logger.info("Model loaded successfully")
             
-    def transcribe_audio(self, audio_path: Path, language: str = "ja") -> Dict[str, Any]:
-        self.load_model()
+    def _load_faster_whisper(self) -> "WhisperModel":
+        device, _, device_index = self.device.partition(":")
+        compute_type = settings.whisper_compute_type
+        if device == "cuda" and compute_type == "int8":
+            compute_type = "int8_float16"
+            
+        logger.info(f"Loading faster-whisper model: {self.model_name} ({compute_type})")
+        return WhisperModel(
+            self.model_name,
+            device=device,
+            device_index=int(device_index or 0),
+            compute_type=compute_type,
+            num_workers=settings.whisper_workers
+        )
+        
+    def _load_openai_whisper(self) -> whisper.model.Whisper:
+        logger.info(f"Loading Whisper model: {self.model_name}")
+        model = whisper.load_model(self.model_name, device=self.device)
+        
+        if (self.device == "cpu" and settings.whisper_compute_type == "int8"
+                and settings.whisper_quantization == "dynamic_int8"):
+            logger.info("Applying dynamic int8 quantization")
+            model = quantize_dynamic_int8(model)
+            
+        if self.device.startswith("cuda"):
+            model = model.half()
+            if settings.whisper_torch_compile:
+                # Only the encoder sees a fixed input shape (30s of mel frames);
+                # the decoder's growing kv-cache would keep recompiling.
+                logger.info("Compiling Whisper encoder")
+                model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+                
+        return model
         
-        logger.info(f"Transcribing audio: {audio_path}")
+    def transcribe_audio(self, audio: Union[Path, np.ndarray], language: str = "ja") -> Dict[str, Any]:
+        self.load_model()
         
+        if isinstance(audio, np.ndarray):
+            logger.info(f"Transcribing {len(audio) / whisper.audio.SAMPLE_RATE:.1f}s of buffered audio")
+        else:
+            logger.info(f"Transcribing audio: {audio}")
+            audio = str(audio)
+            
+        if self.backend == "faster-whisper":
+            segments, info = self.model.transcribe(
+                audio,
+                language=language,
+                task="transcribe",
+                beam_size=5,
+                temperature=0.0,
+                compression_ratio_threshold=2.4,
+                log_prob_threshold=-1.0,
+                no_speech_threshold=0.6,
+                condition_on_previous_text=True,
+                initial_prompt=self.initial_prompt
+            )
+            # Left lazy: segments are decoded as process_segments consumes them,
+            # so inference runs there and no intermediate list is kept.
+            return {
+                "segments": (
+                    {
+                        "text": segment.text,
+                        "start": segment.start,
+                        "end": segment.end,
+                        "avg_logprob": segment.avg_logprob
+                    }
+                    for segment in segments
+                ),
+                "duration": info.duration,
+                "language": info.language
+            }
+            
         result = self.model.transcribe(
-            str(audio_path),
+            audio,
             language=language,
             task="transcribe",
             verbose=False,
+            fp16=self.device != "cpu",
             temperature=0.0,
             compression_ratio_threshold=2.4,
             logprob_threshold=-1.0,
             no_speech_threshold=0.6,
             condition_on_previous_text=True,
-            initial_prompt="これは建設現場での会議の音声です。専門用語に注意してください。"
+            initial_prompt=self.initial_prompt
         )
         
         return result
     
-    def process_segments(self, segments: List[Dict], apply_correction: bool = True) -> List[TranscriptionSegment]:
+    def process_segments(self, segments: Iterable[Dict], apply_correction: bool = True) -> List[TranscriptionSegment]:
+        # Corrected a batch at a time, so a lazy transcription keeps decoding
+        # as it is consumed; the corrector's word cache carries repeated words
+        # across batches.
+        segments = iter(segments)
         processed_segments = []
         
-        for segment in segments:
-            text = segment["text"].strip()
-            
+        while True:
+            batch = list(islice(segments, CORRECTION_BATCH_SIZE))
+            if not batch:
+                break
+                
+            texts = [segment["text"].strip() for segment in batch]
             if apply_correction:
-                corrected_text, corrections = self.term_corrector.correct_text(text)
+                corrected_texts = [
+                    corrected_text
+                    for corrected_text, _ in self.term_corrector.correct_text_batch(texts)
+                ]
             else:
-                corrected_text = text
-                corrections = []
+                corrected_texts = texts
+                
+            for segment, text, corrected_text in zip(batch, texts, corrected_texts):
+                processed_segment = TranscriptionSegment(
+                    text=text,
+                    corrected_text=corrected_text,
+                    start_time=segment["start"],
+                    end_time=segment["end"],
+                    confidence=1.0 - segment.get("avg_logprob", 0),
+                    speaker=None
+                )
+                
+                processed_segments.append(processed_segment)
                 
-            processed_segment = TranscriptionSegment(
-                text=text,
-                corrected_text=corrected_text,
-                start_time=segment["start"],
-                end_time=segment["end"],
-                confidence=1.0 - segment.get("avg_logprob", 0),
-                speaker=None
-            )
-            
-            processed_segments.append(processed_segment)
-            
         return processed_segments
     
     def merge_segments(self, segments: List[TranscriptionSegment], max_gap: float = 2.0) -> List[TranscriptionSegment]:
         if not segments:
             return []
             
+        # A merged segment takes the end time of its last member, so a group
+        # breaks exactly where a segment starts too long after the previous one ended.
+        starts, ends = self._segment_times(segments)
+        bounds = [0, *(np.flatnonzero(starts[1:] - ends[:-1] > max_gap) + 1).tolist(), len(segments)]
+        
         merged = []
-        current = segments[0]
-        
-        for next_segment in segments[1:]:
-            if next_segment.start_time - current.end_time <= max_gap:
-                current = TranscriptionSegment(
-                    text=current.text + " " + next_segment.text,
-                    corrected_text=current.corrected_text + " " + next_segment.corrected_text,
-                    start_time=current.start_time,
-                    end_time=next_segment.end_time,
-                    confidence=min(current.confidence, next_segment.confidence),
-                    speaker=current.speaker
-                )
-            else:
-                merged.append(current)
-                current = next_segment
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if hi - lo == 1:
+                merged.append(segments[lo])
+                continue
                 
-        merged.append(current)
+            # Every field is derived from already validated segments.
+            group = segments[lo:hi]
+            merged.append(TranscriptionSegment.model_construct(
+                text=" ".join(s.text for s in group),
+                corrected_text=" ".join(s.corrected_text for s in group),
+                start_time=group[0].start_time,
+                end_time=group[-1].end_time,
+                confidence=min(s.confidence for s in group),
+                speaker=group[0].speaker
+            ))
+            
         return merged
     
-    async def transcribe_file(self, file_path: Path, apply_correction: bool = True) -> TranscriptionResult:
+    def _segment_times(self, segments: List[TranscriptionSegment]):
+        starts = np.fromiter((s.start_time for s in segments), dtype=np.float64, count=len(segments))
+        ends = np.fromiter((s.end_time for s in segments), dtype=np.float64, count=len(segments))
+        return starts, ends
+    
+    def transcribe_file_sync(self, file_path: Path, apply_correction: bool = True) -> TranscriptionResult:
+        return self.transcribe_sync(file_path, file_path.name, apply_correction)
+        
+    def transcribe_sync(
+        self,
+        audio: Union[Path, np.ndarray],
+        file_name: str,
+        apply_correction: bool = True
+    ) -> TranscriptionResult:
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor,
-                self.transcribe_audio,
-                file_path
-            )
+            result = self.transcribe_audio(audio)
             
             segments = self.process_segments(result["segments"], apply_correction)
             
@@ -118,7 +243,7 @@ class WhisperTranscriber:
             corrected_text = " ".join([s.corrected_text for s in segments])
             
             transcription_result = TranscriptionResult(
-                file_name=file_path.name,
+                file_name=file_name,
                 original_text=original_text,
                 corrected_text=corrected_text,
                 segments=segments,
@@ -129,17 +254,43 @@ class WhisperTranscriber:
             return transcription_result
             
         except Exception as e:
-            logger.error(f"Error transcribing file {file_path}: {e}")
+            logger.error(f"Error transcribing {file_name}: {e}")
             raise
             
-    def save_transcription(self, transcription: TranscriptionResult, db: Session) -> int:
-        segments_json = json.dumps([s.dict() for s in transcription.segments], ensure_ascii=False)
+    async def transcribe_file(self, file_path: Path, apply_correction: bool = True) -> TranscriptionResult:
+        # Term correction encodes every segment, so it runs in the executor
+        # together with inference instead of on the event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            self.transcribe_file_sync,
+            file_path,
+            apply_correction
+        )
+        
+    async def transcribe_batch(self, file_paths: List[Path], apply_correction: bool = True) -> List[TranscriptionResult]:
+        # Each file takes one executor thread; faster-whisper runs up to
+        # whisper_workers of them concurrently (num_workers), the rest queue.
+        return await asyncio.gather(*(
+            self.transcribe_file(file_path, apply_correction) for file_path in file_paths
+        ))
         
+    async def transcribe_array(self, audio: np.ndarray, apply_correction: bool = True) -> TranscriptionResult:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            self.transcribe_sync,
+            audio,
+            "realtime",
+            apply_correction
+        )
+            
+    def save_transcription(self, transcription: TranscriptionResult, db: Session) -> int:
         db_transcription = TranscriptionDB(
             file_name=transcription.file_name,
             original_text=transcription.original_text,
             corrected_text=transcription.corrected_text,
-            segments=segments_json,
+            segments=[s.dict() for s in transcription.segments],
             duration=transcription.duration,
             language=transcription.language
         )
@@ -156,74 +307,76 @@ class WhisperTranscriber:
         if not db_transcription:
             return None
             
-        segments = [TranscriptionSegment(**s) for s in json.loads(db_transcription.segments)]
-        
+        # The raw segment dicts are validated by pydantic-core in one pass
+        # rather than constructing each TranscriptionSegment from Python.
         return TranscriptionResult(
             id=db_transcription.id,
             file_name=db_transcription.file_name,
             original_text=db_transcription.original_text,
             corrected_text=db_transcription.corrected_text,
-            segments=segments,
+            segments=db_transcription.segments,
             duration=db_transcription.duration,
             language=db_transcription.language,
             created_at=db_transcription.created_at
         )
     
     def identify_speakers(self, segments: List[TranscriptionSegment]) -> List[TranscriptionSegment]:
-        updated_segments = []
-        
-        current_speaker = "Speaker 1"
-        speaker_count = 1
-        last_end_time = 0
+        if not segments:
+            return []
+            
+        starts, ends = self._segment_times(segments)
+        last_ends = np.concatenate(([0.0], ends[:-1]))
+        speaker_numbers = 1 + np.cumsum(starts - last_ends > 3.0)
         
-        for segment in segments:
-            if segment.start_time - last_end_time > 3.0:
-                speaker_count += 1
-                current_speaker = f"Speaker {speaker_count}"
-                
-            segment.speaker = current_speaker
-            updated_segments.append(segment)
-            last_end_time = segment.end_time
+        for segment, speaker_number in zip(segments, speaker_numbers.tolist()):
+            segment.speaker = f"Speaker {speaker_number}"
             
-        return updated_segments
+        return list(segments)
     
     def extract_key_phrases(self, text: str, min_length: int = 3) -> List[str]:
-        terms_in_context = self.term_corrector.get_terms_in_context(text)
+        terms_in_context = self.term_corrector.get_terms_in_context(text, min_confidence=0.8)
         
-        key_phrases = []
-        for term_info in terms_in_context:
-            if term_info["confidence"] >= 0.8:
-                key_phrases.append(term_info["term"])
-                
-        return list(set(key_phrases))
+        return list({term_info["term"] for term_info in terms_in_context})
 
 
 class RealTimeTranscriber:
     def __init__(self, transcriber: WhisperTranscriber):
         self.transcriber = transcriber
-        self.buffer = []
         self.buffer_duration = 5.0
+        self.buffer = np.zeros(int(self.buffer_duration * whisper.audio.SAMPLE_RATE * 2), dtype=np.float32)
+        self.buffered_samples = 0
         
     async def process_audio_chunk(self, audio_chunk: np.ndarray, sample_rate: int = 16000) -> Optional[str]:
-        chunk_duration = len(audio_chunk) / sample_rate
-        
-        self.buffer.append(audio_chunk)
-        
-        total_duration = sum(len(chunk) / sample_rate for chunk in self.buffer)
-        
-        if total_duration >= self.buffer_duration:
-            combined_audio = np.concatenate(self.buffer)
-            
-            temp_file = Path("/tmp/temp_audio.wav")
-            import soundfile as sf
-            sf.write(temp_file, combined_audio, sample_rate)
+        # Whisper expects floats in [-1, 1]; microphones mostly send int16 PCM.
+        if np.issubdtype(audio_chunk.dtype, np.integer):
+            audio_chunk = audio_chunk.astype(np.float32) / np.iinfo(audio_chunk.dtype).max
+        if audio_chunk.ndim > 1:
+            audio_chunk = audio_chunk.mean(axis=1)
             
-            result = await self.transcriber.transcribe_file(temp_file, apply_correction=True)
-            
-            self.buffer = []
+        start = self.buffered_samples
+        end = start + len(audio_chunk)
+        if end > len(self.buffer):
+            # Doubled so a run of oversized chunks does not reallocate every time.
+            buffer = np.zeros(max(end, 2 * len(self.buffer)), dtype=np.float32)
+            buffer[:start] = self.buffer[:start]
+            self.buffer = buffer
+        self.buffer[start:end] = audio_chunk
+        self.buffered_samples = end
+        
+        if self.buffered_samples >= self.buffer_duration * sample_rate:
+            # Copied because the next chunks overwrite the buffer while this
+            # window is still being transcribed in the executor.
+            combined_audio = self.buffer[:self.buffered_samples].copy()
+            self.buffered_samples = 0
             
-            temp_file.unlink()
+            if sample_rate != whisper.audio.SAMPLE_RATE:
+                import torchaudio.functional as F
+                combined_audio = F.resample(
+                    torch.from_numpy(combined_audio), sample_rate, whisper.audio.SAMPLE_RATE
+                ).numpy()
+                
+            result = await self.transcriber.transcribe_array(combined_audio, apply_correction=True)
             
             return result.corrected_text
             
-        return None
\ No newline at end of file
+        return None
@@ -1,84 +1,371 @@
 import numpy as np
 import faiss
-import pickle
+import math
+import os
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict
+from functools import lru_cache
+from itertools import islice
+from typing import List, Tuple, Optional, Dict, NamedTuple
 import logging
+import threading
+import time
+import torch
+from cachetools import LRUCache
 from sentence_transformers import SentenceTransformer
 from ..core.database import TermDB, get_db
 from ..core.config import settings
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from .pattern_matching import compile_literals, find_literals
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+except ImportError:
+    ORTModelForFeatureExtraction = None
 
 logger = logging.getLogger(__name__)
 
+INDEX_FACTORY = "HNSW32,SQ8"
+INDEX_VERSION = 4
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+EMBEDDING_BATCH_SIZE = 64
+GPU_EMBEDDING_BATCH_SIZE = 256
+WORD_CACHE_SIZE = 4096
+INDEX_RETRY_SECONDS = 30
+INDEX_BATCH_SIZE = 4096
+IVF_ENCODING = "PQ16x8"
+IVF_TRAIN_SAMPLE = 65536
+IVF_NPROBE = 16
+DELTA_MIN_FLUSH = 64
+DELTA_FLUSH_FRACTION = 0.2
+# IO_FLAG_MMAP_IFC only exists from faiss 1.8; older builds have the
+# narrower IO_FLAG_MMAP.
+INDEX_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def _pack_terms(terms: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    # Terms are stored as one UTF-8 buffer plus offsets so the mappings load
+    # without unpickling a Python object per term.
+    encoded = [term.encode() for term in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_terms(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+    buffer = data.tobytes()
+    bounds = offsets.tolist()
+    return [buffer[start:end].decode() for start, end in zip(bounds, bounds[1:])]
+
+
+class IndexSnapshot(NamedTuple):
+    # Everything a search reads, replaced as a whole so that a concurrent
+    # rebuild, reload or flush is never seen half applied.
+    index: faiss.Index
+    # Term text and database id of each index row, by row id.
+    terms: List[str]
+    db_ids: np.ndarray
+    on_gpu: bool = False
+    mmapped: bool = False
+    # Terms added since the index was last written, kept in a small flat
+    # (fp16) index that search scans alongside the main one.
+    delta_index: Optional[faiss.Index] = None
+    delta_terms: Tuple[Tuple[str, int], ...] = ()
+
+
+@lru_cache(maxsize=2)
+def _load_model(model_name: str) -> SentenceTransformer:
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer(model_name, device=device)
+    model.eval()
+    if device == "cuda":
+        model.half()
+    return model
+
+
+class OnnxEncoder:
+    # Drop-in for SentenceTransformer.encode backed by an int8 ONNX export;
+    # the sonoisa models pool by averaging token embeddings.
+    def __init__(self, model_name: str):
+        model_dir = Path(settings.onnx_model_path) / model_name.replace("/", "__")
+        if not (model_dir / ONNX_QUANTIZED_FILE).exists():
+            self._export(model_name, model_dir)
+            
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir, file_name=ONNX_QUANTIZED_FILE)
+        
+    @staticmethod
+    def _export(model_name: str, model_dir: Path):
+        logger.info(f"Exporting {model_name} to ONNX with int8 quantization")
+        model_dir.mkdir(parents=True, exist_ok=True)
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+        
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=model_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        # Batching by length keeps padding to a minimum, as encode does upstream.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = [None] * len(texts)
+        
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[i] for i in batch], padding=True, truncation=True, return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            for i, vector in zip(batch, pooled):
+                embeddings[i] = vector
+                
+        if not embeddings:
+            return np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+        return np.stack(embeddings)
+
+
+@lru_cache(maxsize=2)
+def _load_onnx_encoder(model_name: str) -> OnnxEncoder:
+    return OnnxEncoder(model_name)
+
 
 class VectorSearchEngine:
     def __init__(self, model_name: str = "sonoisa/sentence-bert-base-ja-mean-tokens-v2"):
-        self.model = SentenceTransformer(model_name)
-        self.index: Optional[faiss.IndexFlatL2] = None
-        self.id_to_term: Dict[int, str] = {}
-        self.term_to_id: Dict[str, int] = {}
+        self.encode_batch_size = EMBEDDING_BATCH_SIZE
+        if settings.embedding_backend == "onnx" and ORTModelForFeatureExtraction is not None:
+            self.model = _load_onnx_encoder(model_name)
+        else:
+            if settings.embedding_backend == "onnx":
+                logger.warning("optimum[onnxruntime] is not installed, using sentence-transformers")
+            self.model = _load_model(model_name)
+            if torch.cuda.is_available():
+                self.encode_batch_size = GPU_EMBEDDING_BATCH_SIZE
+        # faiss-cpu builds have no GPU support at all.
+        self.gpu_resources = None
+        if hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0:
+            self.gpu_resources = faiss.StandardGpuResources()
+        self.snapshot: Optional[IndexSnapshot] = None
+        self.load_failed_at: Optional[float] = None
+        # Searches never take this; it only orders the writers that derive a
+        # new snapshot from the current one.
+        self.write_lock = threading.RLock()
+        # Bumped whenever search results may change, so callers caching them
+        # know when to drop their entries.
+        self.generation = 0
         self.index_path = Path(settings.faiss_index_path)
-        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_path.mkdir(parents=True, exist_ok=True)
         
-    def create_embeddings(self, texts: List[str]) -> np.ndarray:
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
+    def create_embeddings(self, texts: List[str], batch_size: Optional[int] = None, pool: Optional[Dict] = None) -> np.ndarray:
+        batch_size = batch_size or self.encode_batch_size
+        if pool is not None:
+            embeddings = self.model.encode_multi_process(texts, pool, batch_size=batch_size)
+        else:
+            with torch.inference_mode():
+                embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
         return embeddings.astype('float32')
     
+    def _normalized_embeddings(self, texts: List[str], pool: Optional[Dict] = None) -> np.ndarray:
+        # On unit vectors the inner product the index scores by is the
+        # cosine similarity itself.
+        embeddings = np.ascontiguousarray(self.create_embeddings(texts, pool=pool))
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
     def build_index_from_db(self, db: Session):
-        terms = db.query(TermDB).all()
+        total = db.query(func.count(TermDB.id)).scalar()
+        if total > settings.faiss_ivf_min_terms:
+            factory = f"IVF{int(4 * math.sqrt(total))},{IVF_ENCODING}"
+            sample_size = IVF_TRAIN_SAMPLE
+        else:
+            # SQ8 only learns per-dimension value ranges, which the first
+            # batch already samples well enough.
+            factory = INDEX_FACTORY
+            sample_size = 1
+            
+        rows = iter(db.query(TermDB.id, TermDB.term).yield_per(INDEX_BATCH_SIZE))
+        index = None
+        pending = []
+        terms: List[str] = []
+        db_ids: List[int] = []
         
-        if not terms:
+        # Each batch is sharded across the GPUs when there is more than one.
+        pool = None
+        if torch.cuda.device_count() > 1 and hasattr(self.model, "start_multi_process_pool"):
+            pool = self.model.start_multi_process_pool()
+            
+        try:
+            while True:
+                batch = list(islice(rows, INDEX_BATCH_SIZE))
+                if batch:
+                    pending.append((batch, self._normalized_embeddings([row.term for row in batch], pool)))
+                    if index is None and sum(len(b) for b, _ in pending) < sample_size:
+                        continue
+                elif not pending:
+                    break
+                    
+                if index is None:
+                    index = self._train_index(factory, np.concatenate([e for _, e in pending]))
+                    
+                for pending_batch, embeddings in pending:
+                    index.add(embeddings)
+                    terms.extend(row.term for row in pending_batch)
+                    db_ids.extend(row.id for row in pending_batch)
+                pending = []
+                logger.info(f"Indexed {len(terms)} terms")
+        finally:
+            if pool is not None:
+                self.model.stop_multi_process_pool(pool)
+                
+        if index is None:
             logger.warning("No terms found in database")
             return
             
-        term_texts = [term.term for term in terms]
-        term_ids = [term.id for term in terms]
+        index, on_gpu = self._place_index(index)
+        with self.write_lock:
+            self._publish(IndexSnapshot(index, terms, np.array(db_ids, dtype=np.int64), on_gpu))
+            self.save_index()
         
-        embeddings = self.create_embeddings(term_texts)
+        logger.info(f"Built index with {len(terms)} terms")
         
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings)
+    def _train_index(self, factory: str, sample: np.ndarray) -> faiss.Index:
+        index = faiss.index_factory(sample.shape[1], factory, faiss.METRIC_INNER_PRODUCT)
+        if hasattr(index, "hnsw"):
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.train(sample)
+        self._set_search_params(index)
+        return index
         
-        self.id_to_term = {i: term_texts[i] for i in range(len(term_texts))}
-        self.term_to_id = {term_texts[i]: term_ids[i] for i in range(len(term_texts))}
+    def _place_index(self, index: faiss.Index) -> Tuple[faiss.Index, bool]:
+        # HNSW has no GPU implementation; the IVF-PQ index for large
+        # dictionaries does.
+        if self.gpu_resources is None or hasattr(index, "hnsw"):
+            return index, False
+        try:
+            index = faiss.index_cpu_to_gpu(self.gpu_resources, 0, index)
+        except Exception as e:
+            logger.warning(f"Keeping the index on CPU: {e}")
+            return index, False
+        self._set_search_params(index)
+        return index, True
         
-        self.save_index()
+    def _publish(self, snapshot: IndexSnapshot):
+        # A single assignment, so searches see either the old snapshot or the
+        # new one.
+        self.snapshot = snapshot
+        self.generation += 1
         
-        logger.info(f"Built index with {len(terms)} terms")
+    @staticmethod
+    def _new_delta_index(dimension: int) -> faiss.Index:
+        # Scanned exhaustively, so half-precision codes halve the bytes read
+        # per query; fp16 needs no training.
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
         
+    @staticmethod
+    def _set_search_params(index: faiss.Index):
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        else:
+            index.nprobe = IVF_NPROBE
+            
     def save_index(self):
-        if self.index is None:
+        snapshot = self.snapshot
+        if snapshot is None:
             logger.error("No index to save")
             return
             
-        faiss.write_index(self.index, str(self.index_path / "terms.index"))
+        # Written aside and renamed over the old file, which a previously
+        # loaded index may still have mapped.
+        index_file = self.index_path / "terms.index"
+        tmp_file = index_file.with_suffix(".index.tmp")
+        faiss.write_index(faiss.index_gpu_to_cpu(snapshot.index) if snapshot.on_gpu else snapshot.index, str(tmp_file))
+        os.replace(tmp_file, index_file)
         
-        with open(self.index_path / "mappings.pkl", "wb") as f:
-            pickle.dump({
-                "id_to_term": self.id_to_term,
-                "term_to_id": self.term_to_id
-            }, f)
-            
+        term_data, term_offsets = _pack_terms(snapshot.terms)
+        np.savez(
+            self.index_path / "mappings.npz",
+            version=INDEX_VERSION,
+            term_data=term_data,
+            term_offsets=term_offsets,
+            db_ids=snapshot.db_ids
+        )
+        
+        self._save_deltas(snapshot)
         logger.info("Index saved successfully")
         
+    def _save_deltas(self, snapshot: IndexSnapshot):
+        deltas_file = self.index_path / "deltas.npz"
+        if not snapshot.delta_terms:
+            deltas_file.unlink(missing_ok=True)
+            return
+            
+        delta_index = snapshot.delta_index
+        term_data, term_offsets = _pack_terms([term for term, _ in snapshot.delta_terms])
+        np.savez(
+            deltas_file,
+            embeddings=delta_index.reconstruct_n(0, delta_index.ntotal).astype(np.float16),
+            term_data=term_data,
+            term_offsets=term_offsets,
+            db_ids=np.array([db_id for _, db_id in snapshot.delta_terms], dtype=np.int64)
+        )
+        
     def load_index(self) -> bool:
         index_file = self.index_path / "terms.index"
-        mappings_file = self.index_path / "mappings.pkl"
+        mappings_file = self.index_path / "mappings.npz"
         
+        if index_file.exists() and (self.index_path / "mappings.pkl").exists() and not mappings_file.exists():
+            logger.warning("Index was built in an older format; rebuild it via /terms/rebuild-index")
+            return False
+            
         if not index_file.exists() or not mappings_file.exists():
             logger.warning("Index files not found")
             return False
             
         try:
-            self.index = faiss.read_index(str(index_file))
-            
-            with open(mappings_file, "rb") as f:
-                mappings = pickle.load(f)
-                self.id_to_term = mappings["id_to_term"]
-                self.term_to_id = mappings["term_to_id"]
+            with np.load(mappings_file) as mappings:
+                if int(mappings["version"]) != INDEX_VERSION:
+                    logger.warning("Index was built in an older format; rebuild it via /terms/rebuild-index")
+                    return False
+                terms = _unpack_terms(mappings["term_data"], mappings["term_offsets"])
+                db_ids = mappings["db_ids"]
                 
+            try:
+                index = faiss.read_index(str(index_file), INDEX_MMAP_FLAGS)
+                mmapped = True
+            except RuntimeError as e:
+                # Not every index type can be mapped by every faiss version.
+                logger.warning(f"Reading the index without mmap: {e}")
+                index = faiss.read_index(str(index_file))
+                mmapped = False
+            self._set_search_params(index)
+            index, on_gpu = self._place_index(index)
+            
+            delta_index = None
+            delta_terms = ()
+            deltas_file = self.index_path / "deltas.npz"
+            if deltas_file.exists():
+                with np.load(deltas_file) as deltas:
+                    embeddings = deltas["embeddings"].astype(np.float32)
+                    delta_index = self._new_delta_index(embeddings.shape[1])
+                    delta_index.add(embeddings)
+                    delta_terms = tuple(zip(
+                        _unpack_terms(deltas["term_data"], deltas["term_offsets"]),
+                        deltas["db_ids"].tolist()
+                    ))
+                    
+            with self.write_lock:
+                self._publish(IndexSnapshot(
+                    index, terms, db_ids, on_gpu, mmapped and not on_gpu, delta_index, delta_terms
+                ))
+            
             logger.info("Index loaded successfully")
             return True
             
@@ -87,76 +374,192 @@ class VectorSearchEngine:
             return False
             
     def search(self, query: str, k: int = 10, threshold: float = 0.8) -> List[Tuple[str, float, int]]:
-        if self.index is None:
+        return self.search_batch([query], k, threshold)[0]
+    
+    def search_batch(self, queries: List[str], k: int = 10, threshold: float = 0.8) -> List[List[Tuple[str, float, int]]]:
+        if not queries:
+            return []
+            
+        snapshot = self.snapshot
+        if snapshot is None:
+            # Until an index exists, every query would otherwise go back to
+            # the disk and log the same two errors.
+            if self.load_failed_at is not None and time.monotonic() - self.load_failed_at < INDEX_RETRY_SECONDS:
+                return [[] for _ in queries]
             if not self.load_index():
+                self.load_failed_at = time.monotonic()
                 logger.error("No index available for search")
-                return []
-                
-        query_embedding = self.create_embeddings([query])
+                return [[] for _ in queries]
+            snapshot = self.snapshot
+            
+        query_embeddings = self._normalized_embeddings(queries)
         
-        distances, indices = self.index.search(query_embedding, k)
+        index = snapshot.index
+        if hasattr(index, "hnsw") and 2 * k > HNSW_EF_SEARCH:
+            # HNSW only ever widens its beam to k, which loses recall for large
+            # k; per-call parameters leave the shared index's setting alone.
+            distances, indices = index.search(
+                query_embeddings, k, params=faiss.SearchParametersHNSW(efSearch=2 * k)
+            )
+        else:
+            distances, indices = index.search(query_embeddings, k)
+        delta_index = snapshot.delta_index
+        if delta_index is not None:
+            delta_distances, delta_indices = delta_index.search(query_embeddings, k)
         
-        results = []
-        for i in range(len(indices[0])):
-            idx = indices[0][i]
-            distance = distances[0][i]
+        # Thresholding runs over the whole (queries, k) result at once, so only
+        # the surviving hits are touched in Python.
+        keep = (indices != -1) & (distances.astype(np.float64) >= threshold)
+        if delta_index is not None:
+            delta_keep = (delta_indices != -1) & (delta_distances.astype(np.float64) >= threshold)
             
-            if idx == -1:
-                continue
-                
-            similarity = 1 / (1 + distance)
+        all_results = []
+        for row in range(len(queries)):
+            cols = np.flatnonzero(keep[row])
+            results = [
+                (snapshot.terms[idx], similarity, int(snapshot.db_ids[idx]))
+                for idx, similarity in zip(indices[row, cols].tolist(), distances[row, cols].tolist())
+            ]
             
-            if similarity >= threshold:
-                term = self.id_to_term.get(idx, "")
-                db_id = self.term_to_id.get(term, -1)
-                results.append((term, similarity, db_id))
+            if delta_index is not None:
+                cols = np.flatnonzero(delta_keep[row])
+                for idx, similarity in zip(delta_indices[row, cols].tolist(), delta_distances[row, cols].tolist()):
+                    term, db_id = snapshot.delta_terms[idx]
+                    results.append((term, similarity, db_id))
+                results = sorted(results, key=lambda r: r[1], reverse=True)[:k]
                 
-        return results
+            all_results.append(results)
+            
+        return all_results
     
     def find_similar_terms(self, term: str, k: int = 5) -> List[Tuple[str, float]]:
         results = self.search(term, k=k+1, threshold=0.0)
         
-        filtered_results = [(t, s) for t, s, _ in results if t.lower() != term.lower()]
+        term_lower = term.lower()
+        filtered_results = [(t, s) for t, s, _ in results if t.lower() != term_lower]
         
         return filtered_results[:k]
     
     def update_single_term(self, term: TermDB):
-        if not self.load_index():
+        if self.snapshot is None and not self.load_index():
             db = next(get_db())
             self.build_index_from_db(db)
             return
             
-        term_embedding = self.create_embeddings([term.term])
-        
-        new_idx = len(self.id_to_term)
-        self.index.add(term_embedding)
-        self.id_to_term[new_idx] = term.term
-        self.term_to_id[term.term] = term.id
+        term_embedding = self._normalized_embeddings([term.term])
         
-        self.save_index()
+        with self.write_lock:
+            snapshot = self.snapshot
+            # Searches may be scanning the published delta, so the term goes
+            # into a copy of it.
+            if snapshot.delta_index is None:
+                delta_index = self._new_delta_index(term_embedding.shape[1])
+            else:
+                delta_index = faiss.clone_index(snapshot.delta_index)
+            delta_index.add(term_embedding)
+            snapshot = snapshot._replace(
+                delta_index=delta_index,
+                delta_terms=snapshot.delta_terms + ((term.term, term.id),)
+            )
+            self._publish(snapshot)
+            
+            if len(snapshot.delta_terms) >= max(DELTA_MIN_FLUSH, DELTA_FLUSH_FRACTION * len(snapshot.terms)):
+                self.flush()
+            else:
+                self._save_deltas(snapshot)
+                
+    def flush(self):
+        with self.write_lock:
+            snapshot = self.snapshot
+            if snapshot is None or not snapshot.delta_terms:
+                return
+                
+            # The delta is merged into a CPU copy of the main index, which
+            # searches keep using until the merged snapshot replaces it.
+            if snapshot.mmapped:
+                # Mapped codes are read-only and clones keep the mapping;
+                # adding to them aborts inside faiss.
+                index = faiss.read_index(str(self.index_path / "terms.index"))
+            elif snapshot.on_gpu:
+                index = faiss.index_gpu_to_cpu(snapshot.index)
+            else:
+                index = faiss.clone_index(snapshot.index)
+            self._set_search_params(index)
+            
+            delta_index = snapshot.delta_index
+            index.add(delta_index.reconstruct_n(0, delta_index.ntotal))
+            index, on_gpu = self._place_index(index)
+            self._publish(IndexSnapshot(
+                index,
+                snapshot.terms + [term for term, _ in snapshot.delta_terms],
+                np.concatenate([snapshot.db_ids, np.array([db_id for _, db_id in snapshot.delta_terms], dtype=np.int64)]),
+                on_gpu
+            ))
+            
+            self.save_index()
 
 
 class TermCorrector:
     def __init__(self, vector_engine: VectorSearchEngine):
         self.vector_engine = vector_engine
         self.db = next(get_db())
+        self.term_keys: Tuple[str, ...] = ()
+        self.term_literals: List[str] = []
+        self.term_database = None
+        # Best match (or None) per (word, threshold), shared across calls since
+        # transcripts keep repeating the same words.
+        self.word_cache = LRUCache(maxsize=WORD_CACHE_SIZE)
+        self.word_cache_generation = None
+        self.word_cache_lock = threading.Lock()
         
     def correct_text(self, text: str, confidence_threshold: float = 0.85) -> Tuple[str, List[Dict]]:
-        words = text.split()
-        corrected_words = []
-        corrections = []
-        
-        for i, word in enumerate(words):
-            if len(word) < 2:
-                corrected_words.append(word)
-                continue
-                
-            search_results = self.vector_engine.search(word, k=1, threshold=confidence_threshold)
+        return self.correct_text_batch([text], confidence_threshold)[0]
+    
+    def correct_text_batch(self, texts: List[str], confidence_threshold: float = 0.85) -> List[Tuple[str, List[Dict]]]:
+        words_per_text = [text.split() for text in texts]
+        
+        # Every distinct word across all texts is embedded and searched in one go.
+        candidates = list(dict.fromkeys(
+            word for words in words_per_text for word in words if len(word) >= 2
+        ))
+        generation = self.vector_engine.generation
+        with self.word_cache_lock:
+            if self.word_cache_generation != generation:
+                self.word_cache.clear()
+                self.word_cache_generation = generation
+            matches = {}
+            for word in candidates:
+                match = self.word_cache.get((word, confidence_threshold), False)
+                if match is not False:
+                    matches[word] = match
+                    
+        misses = [word for word in candidates if word not in matches]
+        if misses:
+            searched = {
+                word: results[0] if results else None
+                for word, results in zip(
+                    misses,
+                    self.vector_engine.search_batch(misses, k=1, threshold=confidence_threshold)
+                )
+            }
+            matches.update(searched)
+            with self.word_cache_lock:
+                if self.word_cache_generation == generation:
+                    for word, match in searched.items():
+                        self.word_cache[(word, confidence_threshold)] = match
+                        
+        best_matches = {word: match for word, match in matches.items() if match is not None}
+        
+        corrected = []
+        for words in words_per_text:
+            corrected_words = []
+            corrections = []
             
-            if search_results:
-                best_match, similarity, db_id = search_results[0]
+            for i, word in enumerate(words):
+                match = best_matches.get(word)
                 
-                if best_match.lower() != word.lower() and similarity >= confidence_threshold:
+                if match and match[0].lower() != word.lower() and match[1] >= confidence_threshold:
+                    best_match, similarity, db_id = match
                     corrected_words.append(best_match)
                     corrections.append({
                         "original": word,
@@ -166,27 +569,27 @@ class TermCorrector:
                     })
                 else:
                     corrected_words.append(word)
-            else:
-                corrected_words.append(word)
-                
-        corrected_text = " ".join(corrected_words)
-        return corrected_text, corrections
+                    
+            corrected.append((" ".join(corrected_words), corrections))
+            
+        return corrected
     
-    def get_terms_in_context(self, text: str, window_size: int = 50) -> List[Dict]:
+    def get_terms_in_context(self, text: str, window_size: int = 50, min_confidence: float = 0.7) -> List[Dict]:
         found_terms = []
         
-        all_terms = self.db.query(TermDB).filter(TermDB.confidence >= 0.7).all()
+        all_terms = self.db.query(TermDB).filter(TermDB.confidence >= min_confidence).all()
+        text_lower = text.lower()
         
-        for term in all_terms:
-            term_text = term.term.lower()
-            text_lower = text.lower()
+        keys = tuple(term.term for term in all_terms)
+        if keys != self.term_keys:
+            self.term_literals = [key.lower() for key in keys]
+            self.term_database = compile_literals(self.term_literals)
+            self.term_keys = keys
             
-            start = 0
-            while True:
-                pos = text_lower.find(term_text, start)
-                if pos == -1:
-                    break
-                    
+        positions = find_literals(text_lower, self.term_literals, self.term_database)
+        
+        for term, term_text, term_positions in zip(all_terms, self.term_literals, positions):
+            for pos in term_positions:
                 context_start = max(0, pos - window_size)
                 context_end = min(len(text), pos + len(term_text) + window_size)
                 context = text[context_start:context_end]
@@ -199,6 +602,4 @@ class TermCorrector:
                     "confidence": term.confidence
                 })
                 
-                start = pos + 1
-                
         return found_terms
\ No newline at end of file
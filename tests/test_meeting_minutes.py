@@ -1,4 +1,6 @@
 import pytest
+import asyncio
+import httpx
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 from src.services.meeting_minutes import ActionItemExtractor, MeetingMinutesGenerator
@@ -125,14 +127,48 @@ class TestActionItemExtractor:
         assert len(action_items) >= 1
         assert any("設計図面" in item.title for item in action_items)
 
+    def test_merge_similar_items(self, extractor):
+        items = [
+            ActionItem(title="図面 修正 確認", description="a", priority=ActionItemPriority.MEDIUM, confidence=0.7),
+            ActionItem(title="資材 発注", description="b", priority=ActionItemPriority.MEDIUM, confidence=0.8),
+            ActionItem(title="図面 修正 確認", description="c", priority=ActionItemPriority.HIGH, confidence=0.9),
+            ActionItem(title="図面 提出", description="d", priority=ActionItemPriority.LOW, confidence=0.6)
+        ]
+
+        merged = extractor._merge_similar_items(items)
+
+        # Only the two identical titles should be merged
+        assert len(merged) == 3
+        assert merged[0].description == "a\n\nc"
+        assert merged[0].confidence == 0.9
+
 
 class TestMeetingMinutesGenerator:
     
     @pytest.fixture
     def generator(self):
-        with patch('src.services.meeting_minutes.subprocess.run') as mock_run:
-            mock_run.return_value.returncode = 1  # Simulate Ollama not available
-            return MeetingMinutesGenerator()
+        return MeetingMinutesGenerator()
+    
+    def test_check_ollama(self, generator):
+        status = {"code": 503}
+        
+        def handler(request):
+            assert request.url.path == "/api/tags"
+            return httpx.Response(status["code"], json={"models": []})
+            
+        generator.ollama_client = httpx.AsyncClient(
+            base_url="http://ollama:11434", transport=httpx.MockTransport(handler)
+        )
+        
+        assert asyncio.run(generator.check_ollama()) is False
+        
+        # A failed probe is not retried until the retry interval has passed
+        status["code"] = 200
+        assert asyncio.run(generator.check_ollama()) is False
+        
+        generator.ollama_checked_at -= 120
+        assert asyncio.run(generator.check_ollama()) is True
+        assert generator.ollama_available is True
     
     def test_generate_summary_rule_based(self, generator):
         transcription = TranscriptionResult(
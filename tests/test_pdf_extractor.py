@@ -67,4 +67,27 @@ class TestPDFTermExtractor:
             
             # The actual implementation would parse MeCab output properly
             # For now, just check that the method runs
-            assert isinstance(reading, str)
\ No newline at end of file
+            assert isinstance(reading, str)
+
+    def test_process_pdf_directory(self, extractor, tmp_path):
+        (tmp_path / "a.pdf").write_bytes(b"")
+        (tmp_path / "b.pdf").write_bytes(b"")
+        progress = []
+        
+        def extract(pdf_path):
+            if pdf_path.name == "b.pdf":
+                raise ValueError("broken")
+            return [Term(term="鉄筋", term_type=TermType.MATERIAL, source_document=pdf_path.name, confidence=0.8)]
+        
+        with patch('src.services.pdf_extractor.SessionLocal'), \
+             patch.object(extractor, 'extract_terms_from_pdf', side_effect=extract), \
+             patch.object(extractor, 'save_terms_to_db') as mock_save:
+            results = extractor.process_pdf_directory(
+                tmp_path, workers=1, progress_callback=lambda *args: progress.append(args)
+            )
+        
+        assert results["processed_files"] == 1
+        assert results["extracted_terms"] == 1
+        assert results["errors"] == ["b.pdf: broken"]
+        assert progress == [(1, 2, "a.pdf"), (2, 2, "b.pdf")]
+        mock_save.assert_called_once()
@@ -1,6 +1,9 @@
 import pytest
 from unittest.mock import Mock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 from src.services.tagging import SmartTagger
+from src.core.database import Base, ActionItemDB
 from src.core.models import ActionItem, ActionItemPriority, ActionItemStatus
 from datetime import datetime, timedelta
 
@@ -11,6 +14,15 @@ class TestSmartTagger:
     def tagger(self):
         return SmartTagger()
     
+    @pytest.fixture
+    def db_session(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        yield db
+        db.close()
+        engine.dispose()
+    
     def test_extract_tags(self, tagger):
         action_item = ActionItem(
             title="安全管理の徹底について",
@@ -91,8 +103,9 @@ class TestSmartTagger:
         mock_db = Mock()
         
         # Mock existing tag
-        existing_tag = Mock(name="安全", category="safety", color="#FF0000")
-        mock_db.query().filter().first.side_effect = [existing_tag, None]
+        existing_tag = Mock(category="safety", color="#FF0000")
+        existing_tag.name = "安全"
+        mock_db.query().filter().all.return_value = [existing_tag]
         
         tag_names = ["安全", "新しいタグ"]
         tags = tagger.create_or_get_tags(tag_names, mock_db)
@@ -100,53 +113,63 @@ class TestSmartTagger:
         # Should return existing tag without creating
         assert len(tags) == 2
         assert tags[0] == existing_tag
+        assert tags[1].name == "新しいタグ"
         
-        # Should create new tag
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called()
+        # Should create the new tag in one batch
+        mock_db.add_all.assert_called_once_with([tags[1]])
+        mock_db.flush.assert_called_once()
     
-    @patch('src.services.tagging.get_db')
-    def test_find_related_items(self, mock_get_db, tagger):
-        mock_db = Mock()
-        
-        # Mock action item with tags
-        tag1 = Mock(id=1, name="安全")
-        tag2 = Mock(id=2, name="緊急")
-        mock_item = Mock(id=1, tags=[tag1, tag2])
-        
-        # Mock related items
-        related_item1 = Mock(id=2, title="関連アイテム1")
-        related_item2 = Mock(id=3, title="関連アイテム2")
-        
-        mock_db.query().filter().first.return_value = mock_item
-        mock_db.query().join().filter().distinct().limit().all.return_value = [
-            related_item1, related_item2
+    def test_find_related_items(self, tagger, db_session):
+        safety, urgent, quality = tagger.create_or_get_tags(["安全", "緊急", "品質"], db_session)
+        source = ActionItemDB(title="元", description="", priority="high", confidence=0.9, tags=[safety, urgent])
+        one_shared = ActionItemDB(title="関連アイテム1", description="", priority="low", confidence=0.8, tags=[safety, quality])
+        both_shared = ActionItemDB(title="関連アイテム2", description="", priority="low", confidence=0.8, tags=[urgent, safety])
+        unrelated = ActionItemDB(title="無関係", description="", priority="low", confidence=0.8, tags=[quality])
+        db_session.add_all([source, one_shared, both_shared, unrelated])
+        db_session.commit()
+        
+        related = tagger.find_related_items(source.id, db_session, limit=5)
+        
+        # Ranked by the number of shared tags
+        assert [item.title for item in related] == ["関連アイテム2", "関連アイテム1"]
+        assert tagger.find_related_items(source.id, db_session, limit=1) == [both_shared]
+        assert tagger.find_related_items(unrelated.id + 1, db_session) == []
+    
+    def test_search_by_tags(self, tagger, db_session):
+        safety, urgent = tagger.create_or_get_tags(["安全", "緊急"], db_session)
+        items = [
+            ActionItemDB(title="アイテム1", description="", priority="high", confidence=0.9, tags=[safety, urgent]),
+            ActionItemDB(title="アイテム2", description="", priority="low", confidence=0.8, tags=[safety]),
+            ActionItemDB(title="アイテム3", description="", priority="low", confidence=0.8, tags=[urgent, safety])
         ]
+        db_session.add_all(items)
+        db_session.commit()
         
-        related = tagger.find_related_items(1, mock_db, limit=5)
+        # Only items carrying every requested tag are returned
+        results = tagger.search_by_tags(["安全", "緊急"], db_session)
+        assert sorted(item.title for item in results) == ["アイテム1", "アイテム3"]
         
-        assert len(related) == 2
-        assert related[0] == related_item1
-        assert related[1] == related_item2
+        results = tagger.search_by_tags(["安全"], db_session)
+        assert len(results) == 3
     
-    @patch('src.services.tagging.get_db')
-    def test_search_by_tags(self, mock_get_db, tagger):
-        mock_db = Mock()
-        
-        # Mock search results
-        item1 = Mock(id=1, title="アイテム1")
-        item2 = Mock(id=2, title="アイテム2")
-        
-        mock_query = Mock()
-        mock_query.filter.return_value = mock_query
-        mock_query.distinct().all.return_value = [item1, item2]
-        mock_db.query().join.return_value = mock_query
-        
-        results = tagger.search_by_tags(["安全", "緊急"], mock_db)
-        
-        assert len(results) == 2
-        assert results[0] == item1
-        assert results[1] == item2
-        
-        # Verify filter was called for each tag
-        assert mock_query.filter.call_count == 2
\ No newline at end of file
+    def test_tag_action_items_bulk(self, tagger, db_session):
+        items = [
+            ActionItemDB(title="安全確認", description="クレーン作業の安全確認", priority="high", confidence=0.9),
+            ActionItemDB(title="資材発注", description="鉄筋の発注", priority="low", assignee="田中さん", confidence=0.8)
+        ]
+        db_session.add_all(items)
+        db_session.commit()
+        
+        tag_count = tagger.tag_action_items_bulk([item.id for item in items], db_session)
+        
+        first_tags = {tag.name for tag in items[0].tags}
+        second_tags = {tag.name for tag in items[1].tags}
+        assert "安全" in first_tags
+        assert "重要度:高" in first_tags
+        assert "資材" in second_tags
+        assert "担当:田中さん" in second_tags
+        assert tag_count == len(first_tags) + len(second_tags)
+        
+        # Re-tagging replaces the existing associations instead of duplicating them
+        assert tagger.tag_action_items_bulk([item.id for item in items], db_session) == tag_count
+        assert len(items[0].tags) == len(first_tags)
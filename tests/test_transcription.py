@@ -0,0 +1,41 @@
+import asyncio
+import numpy as np
+from unittest.mock import AsyncMock, Mock
+from src.services.transcription import RealTimeTranscriber
+
+
+class TestRealTimeTranscriber:
+    
+    def test_process_audio_chunk_normalizes_integer_pcm(self):
+        transcriber = Mock()
+        transcriber.transcribe_array = AsyncMock(return_value=Mock(corrected_text="テスト"))
+        realtime = RealTimeTranscriber(transcriber)
+        
+        int_chunk = np.full(40000, np.iinfo(np.int16).max, dtype=np.int16)
+        int_chunk[::2] = np.iinfo(np.int16).min
+        float_chunk = np.full(40000, 0.5, dtype=np.float32)
+        
+        assert asyncio.run(realtime.process_audio_chunk(int_chunk)) is None
+        assert asyncio.run(realtime.process_audio_chunk(float_chunk)) == "テスト"
+        
+        audio = transcriber.transcribe_array.call_args.args[0]
+        assert audio.dtype == np.float32
+        assert len(audio) == 80000
+        assert np.abs(audio).max() <= 1.0 + 1e-4
+        assert audio[1] == 1.0
+        assert audio[-1] == 0.5
+    
+    def test_process_audio_chunk_grows_buffer(self):
+        transcriber = Mock()
+        transcriber.transcribe_array = AsyncMock(return_value=Mock(corrected_text="テスト"))
+        realtime = RealTimeTranscriber(transcriber)
+        realtime.buffer_duration = 60.0
+        capacity = len(realtime.buffer)
+        
+        asyncio.run(realtime.process_audio_chunk(np.zeros(capacity - 100, dtype=np.float32)))
+        asyncio.run(realtime.process_audio_chunk(np.ones(200, dtype=np.float32)))
+        
+        assert len(realtime.buffer) == 2 * capacity
+        assert realtime.buffered_samples == capacity + 100
+        assert realtime.buffer[capacity - 101] == 0.0
+        assert realtime.buffer[capacity + 99] == 1.0
@@ -1,13 +1,14 @@
 import pytest
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
-from src.services.vector_search import VectorSearchEngine, TermCorrector
+from src.services.vector_search import VectorSearchEngine, TermCorrector, _load_model
 
 
 class TestVectorSearchEngine:
     
     @pytest.fixture
     def vector_engine(self):
+        _load_model.cache_clear()
         with patch('src.services.vector_search.SentenceTransformer'):
             return VectorSearchEngine()
     
@@ -21,7 +22,7 @@ class TestVectorSearchEngine:
         
         assert embeddings.shape == (2, 3)
         assert embeddings.dtype == np.float32
-        vector_engine.model.encode.assert_called_once_with(texts, convert_to_numpy=True)
+        vector_engine.model.encode.assert_called_once_with(texts, batch_size=64, convert_to_numpy=True)
     
     @patch('src.services.vector_search.faiss')
     def test_build_index_from_db(self, mock_faiss, vector_engine):
@@ -31,7 +32,8 @@ class TestVectorSearchEngine:
             Mock(id=1, term="コンクリート"),
             Mock(id=2, term="鉄筋")
         ]
-        mock_db.query().all.return_value = mock_terms
+        mock_db.query().scalar.return_value = len(mock_terms)
+        mock_db.query().yield_per.return_value = mock_terms
         
         # Mock embeddings
         mock_embeddings = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
@@ -40,16 +42,87 @@ class TestVectorSearchEngine:
         # Mock FAISS index
         mock_index = Mock()
         mock_faiss.IndexFlatL2.return_value = mock_index
+        vector_engine.save_index = Mock()
         
         vector_engine.build_index_from_db(mock_db)
         
-        assert vector_engine.index is not None
-        assert len(vector_engine.id_to_term) == 2
-        assert vector_engine.id_to_term[0] == "コンクリート"
-        assert vector_engine.term_to_id["コンクリート"] == 1
+        assert vector_engine.snapshot.index is not None
+        assert vector_engine.snapshot.terms == ["コンクリート", "鉄筋"]
+        assert vector_engine.snapshot.db_ids.tolist() == [1, 2]
+        vector_engine.save_index.assert_called_once()
     
+    def test_search_returns_cosine_similarity(self, vector_engine, tmp_path):
+        vectors = {
+            "コンクリート": [1.0, 0.0, 0.0, 0.0],
+            "鉄筋": [0.0, 1.0, 0.0, 0.0],
+            "型枠": [0.0, 0.0, 1.0, 0.0],
+            "コンクリ": [0.9, 0.1, 0.0, 0.0]
+        }
+        vector_engine.model.encode = Mock(
+            side_effect=lambda texts, **kwargs: np.array([vectors[t] for t in texts])
+        )
+        vector_engine.index_path = tmp_path
+        
+        mock_db = Mock()
+        mock_db.query().scalar.return_value = 3
+        mock_db.query().yield_per.return_value = [
+            Mock(id=i + 1, term=term) for i, term in enumerate(["コンクリート", "鉄筋", "型枠"])
+        ]
+        vector_engine.build_index_from_db(mock_db)
+        
+        results = vector_engine.search("コンクリ", k=2, threshold=0.0)
+        
+        assert results[0][0] == "コンクリート"
+        assert results[0][2] == 1
+        # Cosine of (0.9, 0.1) and (1, 0), within the SQ8 quantization error
+        assert results[0][1] == pytest.approx(0.9938, abs=0.01)
+        assert isinstance(results[0][1], float)
+        assert vector_engine.search("コンクリ", k=1, threshold=0.999) == []
+
+    def test_update_single_term_uses_delta(self, vector_engine, tmp_path):
+        vectors = {
+            "コンクリート": [1.0, 0.0, 0.0, 0.0],
+            "鉄筋": [0.0, 1.0, 0.0, 0.0],
+            "型枠": [0.0, 0.0, 1.0, 0.0],
+            "足場": [0.0, 0.0, 0.0, 1.0]
+        }
+        vector_engine.model.encode = Mock(
+            side_effect=lambda texts, **kwargs: np.array([vectors[t] for t in texts])
+        )
+        vector_engine.index_path = tmp_path
+
+        mock_db = Mock()
+        mock_db.query().scalar.return_value = 3
+        mock_db.query().yield_per.return_value = [
+            Mock(id=i + 1, term=term) for i, term in enumerate(["コンクリート", "鉄筋", "型枠"])
+        ]
+        vector_engine.build_index_from_db(mock_db)
+        searched = vector_engine.snapshot
+        vector_engine.update_single_term(Mock(id=4, term="足場"))
+
+        # The new term is searchable but has not been merged into the main index yet
+        assert vector_engine.snapshot.index.ntotal == 3
+        assert vector_engine.search("足場", k=1, threshold=0.9)[0][0] == "足場"
+        assert (tmp_path / "deltas.npz").exists()
+        # Snapshots already handed to searches are left untouched
+        assert searched.delta_index is None and searched.delta_terms == ()
+
+        vector_engine.snapshot = None
+        assert vector_engine.load_index()
+        assert vector_engine.snapshot.delta_terms == (("足場", 4),)
+
+        loaded = vector_engine.snapshot
+        vector_engine.flush()
+
+        assert vector_engine.snapshot.index.ntotal == 4
+        assert vector_engine.snapshot.terms[3] == "足場"
+        assert vector_engine.snapshot.db_ids[3] == 4
+        assert vector_engine.snapshot.delta_terms == ()
+        assert loaded.index.ntotal == 3
+        assert not (tmp_path / "deltas.npz").exists()
+
     def test_search_without_index(self, vector_engine):
-        vector_engine.index = None
+        vector_engine.snapshot = None
         vector_engine.load_index = Mock(return_value=False)
         
         results = vector_engine.search("test query")
@@ -57,6 +130,25 @@ class TestVectorSearchEngine:
         assert results == []
         vector_engine.load_index.assert_called_once()
 
+    def test_search_without_index_retries_later(self, vector_engine):
+        vector_engine.snapshot = None
+        vector_engine.load_index = Mock(return_value=False)
+
+        assert vector_engine.search_batch(["a", "b"]) == [[], []]
+        assert vector_engine.search("c") == []
+        vector_engine.load_index.assert_called_once()
+
+        vector_engine.load_failed_at -= 60
+        vector_engine.search("c")
+        assert vector_engine.load_index.call_count == 2
+
+    def test_model_shared_across_engines(self, vector_engine):
+        with patch('src.services.vector_search.SentenceTransformer') as mock_st:
+            other = VectorSearchEngine()
+
+        assert other.model is vector_engine.model
+        mock_st.assert_not_called()
+
 
 class TestTermCorrector:
     
@@ -68,11 +160,10 @@ class TestTermCorrector:
                 return TermCorrector(mock_engine)
     
     def test_correct_text(self, term_corrector):
-        # Mock search results
-        term_corrector.vector_engine.search = Mock(
-            side_effect=[
+        # Mock search results, one list per distinct word of two or more characters
+        term_corrector.vector_engine.search_batch = Mock(
+            return_value=[
                 [("コンクリート", 0.9, 1)],  # First word correction
-                [],  # Second word no correction
                 [("施工", 0.85, 2)]  # Third word correction
             ]
         )
@@ -80,6 +171,11 @@ class TestTermCorrector:
         text = "コンクリト の せこう"
         corrected_text, corrections = term_corrector.correct_text(text)
         
+        # Only the multi-character words are searched, in a single batch
+        term_corrector.vector_engine.search_batch.assert_called_once_with(
+            ["コンクリト", "せこう"], k=1, threshold=0.85
+        )
+        
         assert corrected_text == "コンクリート の 施工"
         assert len(corrections) == 2
         assert corrections[0]["original"] == "コンクリト"
@@ -87,6 +183,34 @@ class TestTermCorrector:
         assert corrections[1]["original"] == "せこう"
         assert corrections[1]["corrected"] == "施工"
     
+    def test_correct_text_batch(self, term_corrector):
+        term_corrector.vector_engine.search_batch = Mock(
+            return_value=[[("鉄筋", 0.95, 1)], []]
+        )
+        
+        results = term_corrector.correct_text_batch(["てっきん 配置", "てっきん"])
+        
+        assert results[0] == ("鉄筋 配置", [{"original": "てっきん", "corrected": "鉄筋", "confidence": 0.95, "position": 0}])
+        assert results[1][0] == "鉄筋"
+        term_corrector.vector_engine.search_batch.assert_called_once()
+
+    def test_correct_text_caches_words(self, term_corrector):
+        term_corrector.vector_engine.generation = 0
+        term_corrector.vector_engine.search_batch = Mock(
+            side_effect=lambda words, **kwargs: [[("鉄筋", 0.95, 1)] if w == "てっきん" else [] for w in words]
+        )
+
+        term_corrector.correct_text("てっきん 配置")
+        corrected_text, _ = term_corrector.correct_text("配置 てっきん 確認")
+
+        assert corrected_text == "配置 鉄筋 確認"
+        assert term_corrector.vector_engine.search_batch.call_args_list[1].args[0] == ["確認"]
+
+        # A changed index invalidates the cached matches
+        term_corrector.vector_engine.generation = 1
+        term_corrector.correct_text("てっきん")
+        assert term_corrector.vector_engine.search_batch.call_args_list[2].args[0] == ["てっきん"]
+    
     def test_get_terms_in_context(self, term_corrector):
         # Mock database terms
         mock_terms = [